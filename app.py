@@ -4,11 +4,19 @@ AI-powered contract analysis for Indian SMEs
 """
 
 import streamlit as st
+import hashlib
 import json
 import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
@@ -17,18 +25,9 @@ from utils.document_parser import DocumentParser
 from utils.nlp_processor import NLPProcessor
 from utils.risk_analyzer import RiskAnalyzer
 from utils.llm_analyzer import LLMAnalyzer
-from utils.report_generator import ReportGenerator
-
-# Page configuration
-st.set_page_config(
-    page_title="Legal Assistant - AI Contract Analysis",
-    page_icon="⚖️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from utils.report_generator import ReportGenerator, report_timestamp
 
-# Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -46,25 +45,70 @@ st.markdown("""
     .stTabs [data-baseweb="tab-list"] { gap: 2rem; }
     .stTabs [data-baseweb="tab"] { font-size: 1.1rem; font-weight: 600; }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+CONTRACT_TYPES = ('General', 'Employment', 'Vendor', 'Service', 'Lease', 'NDA', 'Partnership')
+
+# Page configuration
+st.set_page_config(
+    page_title="Legal Assistant - AI Contract Analysis",
+    page_icon="⚖️",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+
+@st.cache_resource
+def get_nlp_processor() -> NLPProcessor:
+    """Shared NLPProcessor, so the spaCy model loads once per process."""
+    # Persisting results to disk is opt-in: they contain contract text
+    return NLPProcessor(cache_dir=os.getenv('LEGAL_ASSISTANT_NLP_CACHE_DIR'))
+
+
+@st.cache_resource
+def get_llm_analyzer(api_key: str) -> LLMAnalyzer:
+    """Shared LLMAnalyzer per API key."""
+    # Persisting responses to disk is opt-in: they quote the contract
+    return LLMAnalyzer(api_key, cache_dir=os.getenv('LEGAL_ASSISTANT_LLM_CACHE_DIR'))
+
+
+@st.cache_resource
+def get_report_generator() -> ReportGenerator:
+    """Shared ReportGenerator, so PDF styles are built once per process."""
+    return ReportGenerator()
+
+
+@st.cache_resource
+def load_templates() -> dict:
+    """Load contract templates from disk once per process (read-only)."""
+    with open('prompts/templates.json', 'rb') as f:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(f.read())
+        return json.load(f)
 
 
 def init_session_state():
     """Initialize session state variables."""
-    # Prioritize environment variable
-    env_key = os.getenv('GEMINI_API_KEY')
-    
     defaults = {
         'contract_text': '',
+        'contract_preview': '',
         'analysis_result': None,
         'nlp_result': None,
         'ai_result': None,
         'contract_type': 'general',
-        'api_key': env_key if env_key else ''
+        'upload_id': None,
+        'upload_result': None
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
+    
+    # Prioritize environment variable; only looked up once per session
+    if 'api_key' not in st.session_state:
+        st.session_state.api_key = os.getenv('GEMINI_API_KEY') or ''
 
 
 def render_sidebar():
@@ -92,7 +136,7 @@ def render_sidebar():
                     type="password",
                     help="Overrides the environment key for this session"
                 )
-                if new_key:
+                if new_key and new_key != st.session_state.api_key:
                     st.session_state.api_key = new_key
                     os.environ['GEMINI_API_KEY'] = new_key
                     st.rerun()
@@ -103,7 +147,7 @@ def render_sidebar():
                 help="Get free API key from Google AI Studio"
             )
             
-            if api_key:
+            if api_key and api_key != st.session_state.api_key:
                 st.session_state.api_key = api_key
                 os.environ['GEMINI_API_KEY'] = api_key
                 st.rerun()
@@ -115,10 +159,9 @@ def render_sidebar():
         
         # Contract type selector
         st.markdown("### 📋 Contract Type")
-        contract_types = ['General', 'Employment', 'Vendor', 'Service', 'Lease', 'NDA', 'Partnership']
         st.session_state.contract_type = st.selectbox(
             "Select type for better analysis",
-            contract_types
+            CONTRACT_TYPES
         ).lower()
         
         st.divider()
@@ -127,6 +170,13 @@ def render_sidebar():
         st.markdown("Made with ❤️ for GUVI Hackathon 2026")
 
 
+def set_contract_text(text: str):
+    """Store contract text and its preview, only when the text changes."""
+    if text != st.session_state.contract_text:
+        st.session_state.contract_text = text
+        st.session_state.contract_preview = text[:5000] + ("..." if len(text) > 5000 else "")
+
+
 def render_upload_tab():
     """Render contract upload tab."""
     st.markdown("## 📤 Upload Contract")
@@ -141,12 +191,18 @@ def render_upload_tab():
         )
         
         if uploaded_file:
-            parser = DocumentParser()
-            content = uploaded_file.read()
-            result = parser.parse(content, uploaded_file.name)
+            # Only parse when a new upload arrives, not on every rerun. file_id
+            # changes with each upload, even of an edited file with the same
+            # name and size, and costs nothing to read
+            upload_id = uploaded_file.file_id
+            if upload_id != st.session_state.upload_id:
+                parser = DocumentParser()
+                st.session_state.upload_result = parser.parse(uploaded_file, uploaded_file.name)
+                st.session_state.upload_id = upload_id
+            result = st.session_state.upload_result
             
             if result['success']:
-                st.session_state.contract_text = result['text']
+                set_contract_text(result['text'])
                 st.success(f"✅ Parsed successfully! {result['metadata'].get('word_count', 0)} words")
                 
                 # Show metadata
@@ -166,43 +222,79 @@ def render_upload_tab():
             placeholder="Paste your contract text here..."
         )
         if pasted_text:
-            st.session_state.contract_text = pasted_text
+            set_contract_text(pasted_text)
     
     # Preview
     if st.session_state.contract_text:
         st.divider()
         st.markdown("### 📄 Contract Preview")
         with st.expander("View full contract", expanded=False):
-            st.text(st.session_state.contract_text[:5000] + ("..." if len(st.session_state.contract_text) > 5000 else ""))
+            st.text(st.session_state.contract_preview)
         
         if st.button("🔍 Analyze Contract", type="primary", use_container_width=True):
             analyze_contract()
 
 
+class _UncachedResult(Exception):
+    """Carries a result out of a cached function without storing it."""
+    
+    def __init__(self, result):
+        super().__init__("result not cached")
+        self.result = result
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_risk(text: str, contract_type: str) -> dict:
+    """Risk analysis, cached per contract text and type."""
+    return RiskAnalyzer().analyze(text, contract_type)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_nlp(text: str) -> dict:
+    """NLP analysis, cached per contract text."""
+    return get_nlp_processor().analyze(text)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_llm(text: str, contract_type: str, key_fingerprint: str, _api_key: str) -> dict:
+    """AI analysis, cached per contract text, type and API key fingerprint."""
+    result = get_llm_analyzer(_api_key).analyze_contract(text, contract_type)
+    if result.get('status') == 'ai_unavailable' or result.get('parsed') is False:
+        # Don't cache failures or unparseable replies so the next click retries the API
+        raise _UncachedResult(result)
+    return result
+
+
+def _get_ai_result(text: str, contract_type: str, api_key: str) -> dict:
+    """Run the cached AI analysis, passing through uncached failures."""
+    key_fingerprint = hashlib.sha256(api_key.encode()).hexdigest()
+    try:
+        return _cached_llm(text, contract_type, key_fingerprint, api_key)
+    except _UncachedResult as e:
+        return e.result
+
+
 def analyze_contract():
     """Run full contract analysis."""
+    text = st.session_state.contract_text
+    contract_type = st.session_state.contract_type
+    
     with st.spinner("Analyzing contract..."):
-        # Risk Analysis
-        risk_analyzer = RiskAnalyzer()
-        st.session_state.analysis_result = risk_analyzer.analyze(
-            st.session_state.contract_text,
-            st.session_state.contract_type
-        )
-        
-        # NLP Analysis
-        nlp_processor = NLPProcessor()
-        st.session_state.nlp_result = nlp_processor.analyze(st.session_state.contract_text)
-        
-        # AI Analysis
-        if st.session_state.api_key:
-            llm = LLMAnalyzer(st.session_state.api_key)
-            st.session_state.ai_result = llm.analyze_contract(
-                st.session_state.contract_text,
-                st.session_state.contract_type
-            )
+        # Risk and NLP analysis are local work and independent of the
+        # remote AI call, so run all three side by side
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            future_risk = executor.submit(_cached_risk, text, contract_type)
+            future_nlp = executor.submit(_cached_nlp, text)
+            future_ai = None
+            if st.session_state.api_key:
+                future_ai = executor.submit(_get_ai_result, text, contract_type, st.session_state.api_key)
+            
+            st.session_state.analysis_result = future_risk.result()
+            st.session_state.nlp_result = future_nlp.result()
+            if future_ai is not None:
+                st.session_state.ai_result = future_ai.result()
         
         st.success("✅ Analysis complete! Check the tabs for results.")
-        st.rerun()
 
 
 def render_analysis_tab():
@@ -338,9 +430,7 @@ def render_templates_tab():
     
     # Load templates
     try:
-        with open('prompts/templates.json', 'r') as f:
-            templates_data = json.load(f)
-            templates = templates_data.get('templates', {})
+        templates = load_templates().get('templates', {})
     except:
         st.error("Could not load templates")
         return
@@ -378,6 +468,41 @@ def render_templates_tab():
         )
 
 
+def _result_key(result: dict) -> str:
+    """Stable content hash of an analysis result."""
+    return hashlib.sha256(json.dumps(result, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _report_generated_at(result_key: str) -> str:
+    """One header timestamp per analysis result, shared by every export format."""
+    return report_timestamp()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_text_report(result_key: str, _result: dict) -> str:
+    """Text report, cached per analysis result."""
+    return get_report_generator().generate_text_report(_result, _report_generated_at(result_key))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_text_report_preview(result_key: str, _result: dict) -> str:
+    """First part of the text report, cached per analysis result."""
+    return _cached_text_report(result_key, _result)[:2000]
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_html_report(result_key: str, _result: dict) -> str:
+    """HTML report, cached per analysis result."""
+    return get_report_generator().generate_html_report(_result, _report_generated_at(result_key))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_pdf_report(result_key: str, _result: dict) -> bytes:
+    """PDF report, cached per analysis result."""
+    return get_report_generator().generate_pdf(_result, generated_at=_report_generated_at(result_key))
+
+
 def render_export_tab():
     """Render export options."""
     st.markdown("## 📥 Export Report")
@@ -386,13 +511,14 @@ def render_export_tab():
         st.info("📤 Upload and analyze a contract first")
         return
     
-    generator = ReportGenerator()
+    result = st.session_state.analysis_result
+    result_key = _result_key(result)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 📄 Text Report")
-        text_report = generator.generate_text_report(st.session_state.analysis_result)
+        text_report = _cached_text_report(result_key, result)
         st.download_button(
             "📥 Download Text Report",
             text_report,
@@ -402,11 +528,11 @@ def render_export_tab():
         )
         
         with st.expander("Preview Text Report"):
-            st.text(text_report[:2000])
+            st.text(_cached_text_report_preview(result_key, result))
     
     with col2:
         st.markdown("### 🌐 HTML Report")
-        html_report = generator.generate_html_report(st.session_state.analysis_result)
+        html_report = _cached_html_report(result_key, result)
         st.download_button(
             "📥 Download HTML Report",
             html_report,
@@ -420,7 +546,7 @@ def render_export_tab():
     # PDF (if available)
     st.markdown("### 📑 PDF Report")
     try:
-        pdf_bytes = generator.generate_pdf(st.session_state.analysis_result)
+        pdf_bytes = _cached_pdf_report(result_key, result)
         st.download_button(
             "📥 Download PDF Report",
             pdf_bytes,
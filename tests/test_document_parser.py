@@ -0,0 +1,53 @@
+"""
+Regression tests for DocumentParser text cleanup and section extraction
+"""
+
+import io
+import unittest
+
+from utils.document_parser import DocumentParser
+
+
+class CleanTextTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = DocumentParser()
+
+    def test_adjacent_page_markers_are_both_removed(self):
+        self.assertEqual(self.parser._clean_text('a\nPage 1\n- 2 -\nb'), 'a\nb')
+
+    def test_page_marker_between_paragraphs(self):
+        self.assertEqual(self.parser._clean_text('a\n\n\n\nPage 3 of 9\nb'), 'a\nb')
+
+
+class ParseTxtTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = DocumentParser()
+
+    def test_byte_order_marks(self):
+        text = 'Agreement between the parties'
+        for encoding in ('utf-8-sig', 'utf-16', 'utf-16-be', 'utf-32', 'utf-32-be'):
+            content = text.encode(encoding)
+            if encoding.endswith('-be'):
+                content = ('\ufeff' + text).encode(encoding)
+            with self.subTest(encoding=encoding):
+                self.assertEqual(self.parser._parse_txt(io.BytesIO(content)), text)
+
+
+class ExtractSectionsTests(unittest.TestCase):
+    def setUp(self):
+        self.parser = DocumentParser()
+
+    def test_consecutive_headers_are_each_found(self):
+        text = (
+            "ARTICLE I: Scope\n"
+            "The parties agree to the following terms here.\n"
+            "2. TERMS\n"
+            "Payment shall be made within thirty days of invoice."
+        )
+        sections = self.parser.extract_sections(text)
+        self.assertEqual([s['title'] for s in sections], ['ARTICLE I: Scope', '2. TERMS'])
+        self.assertEqual(sections[0]['content'], 'The parties agree to the following terms here.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,11 +4,14 @@ from .nlp_processor import NLPProcessor
 from .risk_analyzer import RiskAnalyzer
 from .llm_analyzer import LLMAnalyzer
 from .report_generator import ReportGenerator
+from .pipeline import full_pipeline, run_full_pipeline
 
 __all__ = [
     'DocumentParser',
     'NLPProcessor', 
     'RiskAnalyzer',
     'LLMAnalyzer',
-    'ReportGenerator'
+    'ReportGenerator',
+    'full_pipeline',
+    'run_full_pipeline'
 ]
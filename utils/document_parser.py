@@ -5,8 +5,15 @@ Handles parsing of PDF, DOCX, and TXT files for contract analysis
 
 import re
 import io
-from typing import Dict, List, Optional, Tuple
+import os
+import codecs
+import threading
+import multiprocessing
+from typing import BinaryIO, Dict, List, Union
+from collections import Counter
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 try:
     import PyPDF2
@@ -32,6 +39,190 @@ try:
 except ImportError:
     CHARDET_AVAILABLE = False
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Single-pass whitespace and page-number cleanup: one alternation scanned
+# once, replacement chosen by the matching group. Page-number patterns come
+# first so they win over the plain newline collapse when both could start at
+# the same position. Their trailing newline is a lookahead, left in place so
+# an adjacent page marker can still anchor on it.
+_RE_CLEANUP = re.compile(
+    r'(?P<page_num>\n\s*(?i:page)\s+\d+\s*(?:(?i:of)\s+\d+)?\s*(?=\n))'
+    r'|(?P<dash_page>\n\s*-\s*\d+\s*-\s*(?=\n))'
+    r'|(?P<multi_nl>\n{3,})'
+    r'|(?P<multi_space> {2,})'
+    r'|(?P<tabs>\t+)'
+)
+_CLEANUP_REPLACEMENTS = {
+    'page_num': '',
+    'dash_page': '',
+    'multi_nl': '\n\n',
+    'multi_space': ' ',
+    'tabs': ' ',
+}
+
+# Missing spaces between words, a common OCR issue in extracted PDF text
+_RE_CAMEL_SPLIT = re.compile(r'[a-z](?=[A-Z])')
+
+# Whitespace-delimited words, counted without building a list
+_RE_WORDS = re.compile(r'\S+')
+
+# Curly quotes and en/em dashes mapped to their ASCII equivalents
+_NORMALIZE_TABLE = str.maketrans({
+    '\u201c': '"', '\u201d': '"',
+    '\u2018': "'", '\u2019': "'",
+    '\u2013': '-', '\u2014': '-',
+})
+
+# Common section header patterns, combined so the text is scanned once.
+# Titles stop at the end of their line, and trailing newlines are lookaheads,
+# so the next header can still anchor on the newline before it.
+_SECTION_RE = re.compile(
+    r'(?:^|\n)(?:'
+    r'(?P<numbered>\d+\.?[ \t]+[A-Z][A-Za-z \t]+)(?::|(?=\n))'  # 1. DEFINITIONS
+    r'|(?P<article>ARTICLE[ \t]+[IVXLCDM\d]+[: \t]+[A-Za-z \t]+)'  # ARTICLE I: Scope
+    r'|(?P<clause>CLAUSE[ \t]+\d+[: \t]+[A-Za-z \t]+)'  # CLAUSE 1: Terms
+    r'|(?P<caps>[A-Z][A-Z \t]+)(?=\n)'  # ALL CAPS HEADERS
+    r'|(?P<subsection>\d+\.\d+[ \t]+[A-Za-z][A-Za-z \t]+)'  # 1.1 Sub-sections
+    r')'
+)
+
+
+# Parallel page extraction is opt-in. Worker start-up and re-reading the file
+# only pay off for very large PDFs, and the app runs inside a threaded server.
+PARALLEL_PDF_ENABLED = bool(os.getenv('LEGAL_ASSISTANT_PARALLEL_PDF'))
+
+_PAGE_POOL = None
+_PAGE_POOL_LOCK = threading.Lock()
+
+
+def _page_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all parsers, created on first use."""
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is None:
+            # Spawned rather than forked: forking a multithreaded process can
+            # deadlock on locks held by other threads
+            _PAGE_POOL = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _PAGE_POOL
+
+
+def _reset_page_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool that failed so the next parse starts a fresh one."""
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is pool:
+            _PAGE_POOL = None
+    pool.shutdown(wait=False)
+
+
+def _extract_page_range(content: bytes, start: int, stop: int, use_pdfplumber: bool) -> List[str]:
+    """Extract text of pages [start, stop) from a private copy of the PDF (pool worker)."""
+    if use_pdfplumber:
+        with pdfplumber.open(io.BytesIO(content)) as pdf:
+            return [page.extract_text() or '' for page in pdf.pages[start:stop]]
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+    return [pdf_reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+# Keywords indicating each contract type
+_TYPE_INDICATORS = {
+    'employment': [
+        'employment agreement', 'employee', 'employer', 'salary',
+        'termination of employment', 'probation period', 'working hours',
+        'leave policy', 'notice period', 'resignation'
+    ],
+    'vendor': [
+        'vendor agreement', 'supplier', 'purchase order', 'delivery',
+        'payment terms', 'invoice', 'goods', 'supply chain'
+    ],
+    'service': [
+        'service agreement', 'service provider', 'scope of services',
+        'service level', 'sla', 'deliverables', 'milestone'
+    ],
+    'lease': [
+        'lease agreement', 'landlord', 'tenant', 'rent', 'premises',
+        'security deposit', 'lease term', 'rental'
+    ],
+    'nda': [
+        'non-disclosure', 'confidential information', 'confidentiality',
+        'trade secret', 'proprietary information', 'nda'
+    ],
+    'partnership': [
+        'partnership agreement', 'partner', 'profit sharing',
+        'capital contribution', 'joint venture', 'partnership deed'
+    ],
+    'loan': [
+        'loan agreement', 'borrower', 'lender', 'principal amount',
+        'interest rate', 'repayment', 'emi', 'collateral'
+    ],
+    'consulting': [
+        'consulting agreement', 'consultant', 'advisory', 'retainer',
+        'consulting services', 'independent contractor'
+    ]
+}
+
+
+_KEYWORD_TYPES = {kw: doc_type for doc_type, keywords in _TYPE_INDICATORS.items() for kw in keywords}
+
+# Union of all keywords, used when pyahocorasick is not installed. The
+# lookahead tries every position so overlapping keywords are found; longest
+# first means a keyword is only hidden by a longer one it is a prefix of,
+# which _KEYWORD_PREFIXES credits back. Matching is case-insensitive so the
+# document doesn't need a lowercased copy; ASCII folding keeps every match
+# lowercasing back to a known keyword.
+_KEYWORDS_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(kw) for kw in sorted(_KEYWORD_TYPES, key=len, reverse=True)) + '))',
+    re.IGNORECASE | re.ASCII
+)
+_KEYWORD_PREFIXES = {
+    kw: tuple(other for other in _KEYWORD_TYPES if kw.startswith(other))
+    for kw in _KEYWORD_TYPES
+}
+
+
+def _build_type_automaton():
+    """Build an Aho-Corasick automaton over all document type keywords."""
+    automaton = ahocorasick.Automaton()
+    for kw in _KEYWORD_TYPES:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+_TYPE_AUTOMATON = _build_type_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def document_type_hints(text: str) -> Dict:
+    """Score document type keywords in text in a single pass."""
+    # Collect distinct keywords present, in a single pass over the text
+    if _TYPE_AUTOMATON is not None:
+        found = {kw for _, kw in _TYPE_AUTOMATON.iter(text.lower())}
+    else:
+        matched = {m.group(1).lower() for m in _KEYWORDS_RE.finditer(text)}
+        found = {prefix for kw in matched for prefix in _KEYWORD_PREFIXES[kw]}
+    
+    hits = Counter(_KEYWORD_TYPES[kw] for kw in found)
+    scores = {
+        doc_type: min(hits[doc_type] / len(keywords), 1.0)
+        for doc_type, keywords in _TYPE_INDICATORS.items()
+    }
+    
+    # Get best match
+    best_type = max(scores, key=scores.get) if scores else 'general'
+    best_score = scores.get(best_type, 0)
+    
+    return {
+        'likely_type': best_type if best_score > 0.1 else 'general',
+        'confidence': best_score,
+        'all_scores': scores
+    }
+
 
 class DocumentParser:
     """
@@ -41,16 +232,24 @@ class DocumentParser:
     
     SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.txt'}
     
+    # With LEGAL_ASSISTANT_PARALLEL_PDF set, PDFs with at least this many
+    # pages are extracted in parallel
+    PARALLEL_PAGE_THRESHOLD = 16
+    MAX_PAGE_WORKERS = 8
+    
+    # Bytes of a text file sampled for encoding detection
+    ENCODING_SAMPLE_SIZE = 65536
+    
     def __init__(self):
         self.last_error = None
         self.metadata = {}
     
-    def parse(self, file_content: bytes, filename: str) -> Dict:
+    def parse(self, file_content: Union[bytes, BinaryIO], filename: str) -> Dict:
         """
         Parse a document and extract text content.
         
         Args:
-            file_content: Raw bytes of the file
+            file_content: Raw bytes of the file, or a seekable binary stream
             filename: Name of the file with extension
             
         Returns:
@@ -70,29 +269,32 @@ class DocumentParser:
             }
         
         try:
+            stream = self._as_stream(file_content)
+            
             if extension == '.pdf':
-                text = self._parse_pdf(file_content)
+                text = self._parse_pdf(stream)
             elif extension in ['.docx', '.doc']:
-                text = self._parse_docx(file_content)
+                text = self._parse_docx(stream)
             elif extension == '.txt':
-                text = self._parse_txt(file_content)
+                text = self._parse_txt(stream)
             else:
                 text = ''
             
             # Clean and normalize text
-            cleaned_text = self._clean_text(text)
+            cleaned_text = self._clean_text(text, fix_ocr=(extension == '.pdf'))
             
             # Extract metadata
             self.metadata['filename'] = filename
             self.metadata['extension'] = extension
             self.metadata['char_count'] = len(cleaned_text)
-            self.metadata['word_count'] = len(cleaned_text.split())
+            self.metadata['word_count'] = sum(1 for _ in _RE_WORDS.finditer(cleaned_text))
             self.metadata['page_estimate'] = max(1, len(cleaned_text) // 3000)
             
             return {
                 'success': True,
                 'text': cleaned_text,
                 'metadata': self.metadata,
+                'type_hints': self.get_document_type_hints(cleaned_text),
                 'error': None
             }
             
@@ -105,72 +307,141 @@ class DocumentParser:
                 'metadata': {}
             }
     
-    def _parse_pdf(self, content: bytes) -> str:
+    @staticmethod
+    def _as_stream(file_content: Union[bytes, BinaryIO]) -> BinaryIO:
+        """Wrap raw bytes in a stream; rewind streams passed in directly."""
+        if isinstance(file_content, (bytes, bytearray)):
+            return io.BytesIO(file_content)
+        file_content.seek(0)
+        return file_content
+    
+    @staticmethod
+    def _join_parts(parts) -> str:
+        """Write non-empty text parts into one buffer, separated by blank lines."""
+        buf = io.StringIO()
+        for part in parts:
+            if not part:
+                continue
+            if buf.tell():
+                buf.write('\n\n')
+            buf.write(part)
+        return buf.getvalue()
+    
+    def _parse_pdf(self, stream: BinaryIO) -> str:
         """Parse PDF file content."""
-        text_parts = []
-        
         # Try pdfplumber first (better for complex layouts)
         if PDFPLUMBER_AVAILABLE:
             try:
-                with pdfplumber.open(io.BytesIO(content)) as pdf:
+                with pdfplumber.open(stream) as pdf:
                     self.metadata['page_count'] = len(pdf.pages)
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                if text_parts:
-                    return '\n\n'.join(text_parts)
+                    text = self._extract_pdf_text(stream, pdf.pages, use_pdfplumber=True)
+                if text:
+                    return text
             except Exception:
                 pass
         
         # Fallback to PyPDF2
         if PDF_AVAILABLE:
             try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+                stream.seek(0)
+                pdf_reader = PyPDF2.PdfReader(stream)
                 self.metadata['page_count'] = len(pdf_reader.pages)
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                return '\n\n'.join(text_parts)
+                return self._extract_pdf_text(stream, pdf_reader.pages, use_pdfplumber=False)
             except Exception as e:
                 raise Exception(f"PDF parsing failed: {str(e)}")
         
         raise Exception("No PDF parsing library available. Install PyPDF2 or pdfplumber.")
     
-    def _parse_docx(self, content: bytes) -> str:
+    def _extract_pdf_text(self, stream: BinaryIO, pages, use_pdfplumber: bool) -> str:
+        """Extract text from all pages, in parallel for large documents if enabled."""
+        if PARALLEL_PDF_ENABLED and len(pages) >= self.PARALLEL_PAGE_THRESHOLD:
+            try:
+                position = stream.tell()
+                stream.seek(0)
+                content = stream.read()  # Workers need their own copy of the file
+                stream.seek(position)
+                return self._join_parts(self._iter_pages_parallel(content, len(pages), use_pdfplumber))
+            except Exception:
+                pass  # Fall back to sequential extraction
+        return self._join_parts(page.extract_text() for page in pages)
+    
+    def _iter_pages_parallel(self, content: bytes, page_count: int, use_pdfplumber: bool):
+        """
+        Yield page text in order, extracting contiguous page ranges in worker processes.
+        
+        PDF libraries are pure Python and share one stream per document, so each
+        worker opens its own copy of the file rather than sharing page objects.
+        """
+        workers = min(self.MAX_PAGE_WORKERS, os.cpu_count() or 1)
+        if workers < 2:
+            raise RuntimeError("Parallel extraction needs more than one CPU")
+        
+        chunk_size = -(-page_count // workers)
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        
+        pool = _page_pool(workers)
+        try:
+            futures = [
+                pool.submit(_extract_page_range, content, start, stop, use_pdfplumber)
+                for start, stop in ranges
+            ]
+            for future in futures:
+                yield from future.result()
+        except BrokenProcessPool:
+            _reset_page_pool(pool)
+            raise
+    
+    def _parse_docx(self, stream: BinaryIO) -> str:
         """Parse DOCX file content."""
         if not DOCX_AVAILABLE:
             raise Exception("python-docx not installed. Run: pip install python-docx")
         
         try:
-            doc = Document(io.BytesIO(content))
-            text_parts = []
-            
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-            
-            # Also extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = ' | '.join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                    if row_text:
-                        text_parts.append(row_text)
+            doc = Document(stream)
+            text = self._join_parts(self._iter_docx_parts(doc))
             
             self.metadata['paragraph_count'] = len(doc.paragraphs)
             self.metadata['table_count'] = len(doc.tables)
             
-            return '\n\n'.join(text_parts)
+            return text
             
         except Exception as e:
             raise Exception(f"DOCX parsing failed: {str(e)}")
     
-    def _parse_txt(self, content: bytes) -> str:
+    @staticmethod
+    def _iter_docx_parts(doc):
+        """Yield paragraph and table row text from a DOCX document."""
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                yield paragraph.text
+        
+        # Also extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                yield ' | '.join(cell.text.strip() for cell in row.cells if cell.text.strip())
+    
+    def _parse_txt(self, stream: BinaryIO) -> str:
         """Parse plain text file content."""
-        # Detect encoding
+        content = stream.read()
+        
+        # Byte order marks identify the encoding outright
+        if content.startswith(codecs.BOM_UTF8):
+            return content.decode('utf-8-sig')
+        # UTF-32 LE's BOM begins with UTF-16 LE's, so it must be checked first
+        if content.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+            return content.decode('utf-32')
+        if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return content.decode('utf-16')
+        
+        # Most text is UTF-8; only fall back to detection when it isn't
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+        
+        # Detect encoding from a bounded sample
         if CHARDET_AVAILABLE:
-            detected = chardet.detect(content)
+            detected = chardet.detect(content[:self.ENCODING_SAMPLE_SIZE])
             encoding = detected.get('encoding', 'utf-8') or 'utf-8'
         else:
             encoding = 'utf-8'
@@ -186,27 +457,20 @@ class DocumentParser:
                     continue
             raise Exception("Could not decode text file with any known encoding")
     
-    def _clean_text(self, text: str) -> str:
+    def _clean_text(self, text: str, fix_ocr: bool = True) -> str:
         """Clean and normalize extracted text."""
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        text = re.sub(r' {2,}', ' ', text)
-        text = re.sub(r'\t+', ' ', text)
-        
-        # Remove page numbers (common patterns)
-        text = re.sub(r'\n\s*Page\s+\d+\s*(?:of\s+\d+)?\s*\n', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'\n\s*-\s*\d+\s*-\s*\n', '\n', text)
+        # Collapse whitespace and drop page numbers in one pass
+        text = _RE_CLEANUP.sub(lambda m: _CLEANUP_REPLACEMENTS[m.lastgroup], text)
         
-        # Fix common OCR issues
-        text = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', text)  # Missing spaces
+        # Fix common OCR issues (only PDF extraction needs this)
+        if fix_ocr:
+            text = _RE_CAMEL_SPLIT.sub(r'\g<0> ', text)
         
         # Normalize quotes and dashes
-        text = text.replace('"', '"').replace('"', '"')
-        text = text.replace(''', "'").replace(''', "'")
-        text = text.replace('–', '-').replace('—', '-')
+        text = text.translate(_NORMALIZE_TABLE)
         
         return text.strip()
     
@@ -222,38 +486,21 @@ class DocumentParser:
         """
         sections = []
         
-        # Common section header patterns
-        patterns = [
-            r'(?:^|\n)(\d+\.?\s+[A-Z][A-Za-z\s]+)(?:\n|:)',  # 1. DEFINITIONS
-            r'(?:^|\n)(ARTICLE\s+[IVXLCDM\d]+[:\s]+[A-Za-z\s]+)',  # ARTICLE I: Scope
-            r'(?:^|\n)(CLAUSE\s+\d+[:\s]+[A-Za-z\s]+)',  # CLAUSE 1: Terms
-            r'(?:^|\n)([A-Z][A-Z\s]+)(?:\n)',  # ALL CAPS HEADERS
-            r'(?:^|\n)(\d+\.\d+\s+[A-Za-z][A-Za-z\s]+)',  # 1.1 Sub-sections
+        # Matches come back in document order, so no sort is needed
+        all_matches = [
+            (match.group(match.lastgroup).strip(), match.start(), match.end())
+            for match in _SECTION_RE.finditer(text)
         ]
         
-        all_matches = []
-        for pattern in patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                all_matches.append({
-                    'title': match.group(1).strip(),
-                    'start': match.start(),
-                    'end': match.end()
-                })
-        
-        # Sort by position
-        all_matches.sort(key=lambda x: x['start'])
-        
         # Extract content between sections
-        for i, match in enumerate(all_matches):
-            start = match['end']
-            end = all_matches[i + 1]['start'] if i + 1 < len(all_matches) else len(text)
-            content = text[start:end].strip()
+        for i, (title, _, start) in enumerate(all_matches):
+            end = all_matches[i + 1][1] if i + 1 < len(all_matches) else len(text)
+            content = text[start:min(end, start + 5000)].strip()  # Limit content length
             
             if content and len(content) > 20:  # Filter out empty sections
                 sections.append({
-                    'title': match['title'],
-                    'content': content[:5000],  # Limit content length
+                    'title': title,
+                    'content': content,
                     'position': i + 1
                 })
         
@@ -269,58 +516,7 @@ class DocumentParser:
         Returns:
             Dict with document type hints and confidence scores
         """
-        text_lower = text.lower()
-        
-        type_indicators = {
-            'employment': [
-                'employment agreement', 'employee', 'employer', 'salary',
-                'termination of employment', 'probation period', 'working hours',
-                'leave policy', 'notice period', 'resignation'
-            ],
-            'vendor': [
-                'vendor agreement', 'supplier', 'purchase order', 'delivery',
-                'payment terms', 'invoice', 'goods', 'supply chain'
-            ],
-            'service': [
-                'service agreement', 'service provider', 'scope of services',
-                'service level', 'sla', 'deliverables', 'milestone'
-            ],
-            'lease': [
-                'lease agreement', 'landlord', 'tenant', 'rent', 'premises',
-                'security deposit', 'lease term', 'rental'
-            ],
-            'nda': [
-                'non-disclosure', 'confidential information', 'confidentiality',
-                'trade secret', 'proprietary information', 'nda'
-            ],
-            'partnership': [
-                'partnership agreement', 'partner', 'profit sharing',
-                'capital contribution', 'joint venture', 'partnership deed'
-            ],
-            'loan': [
-                'loan agreement', 'borrower', 'lender', 'principal amount',
-                'interest rate', 'repayment', 'emi', 'collateral'
-            ],
-            'consulting': [
-                'consulting agreement', 'consultant', 'advisory', 'retainer',
-                'consulting services', 'independent contractor'
-            ]
-        }
-        
-        scores = {}
-        for doc_type, keywords in type_indicators.items():
-            score = sum(1 for kw in keywords if kw in text_lower)
-            scores[doc_type] = min(score / len(keywords), 1.0)
-        
-        # Get best match
-        best_type = max(scores, key=scores.get) if scores else 'general'
-        best_score = scores.get(best_type, 0)
-        
-        return {
-            'likely_type': best_type if best_score > 0.1 else 'general',
-            'confidence': best_score,
-            'all_scores': scores
-        }
+        return document_type_hints(text)
 
 
 # For testing
@@ -348,5 +544,8 @@ if __name__ == "__main__":
     print(f"Success: {result['success']}")
     print(f"Word Count: {result['metadata'].get('word_count', 0)}")
     
-    type_hints = parser.get_document_type_hints(result['text'])
-    print(f"Document Type: {type_hints['likely_type']} (confidence: {type_hints['confidence']:.2f})")
+    if result['success']:
+        type_hints = result['type_hints']
+        print(f"Document Type: {type_hints['likely_type']} (confidence: {type_hints['confidence']:.2f})")
+    else:
+        print(f"Error: {result['error']}")
@@ -3,9 +3,19 @@ LLM Analyzer Module
 Integration with Google Gemini API for AI-powered contract analysis
 """
 
+import io
 import os
+import re
+import copy
 import json
-from typing import Dict, List, Optional
+import time
+import hashlib
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
 
 try:
     import google.generativeai as genai
@@ -13,29 +23,525 @@ try:
 except ImportError:
     GENAI_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Suggested location for the opt-in on-disk response cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'legal_assistant', 'llm')
+
+# Part of every response cache key; bump whenever prompts or response
+# parsing change, so stale cached responses are not served
+_RESPONSE_SCHEMA_VERSION = 1
+
+# Markdown code fence around a response, with optional language tag
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _loads(text: str):
+    """Decode JSON with orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+class _TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per `period` seconds."""
+    
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take a token, returning how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.fill_rate
+    
+    def acquire(self):
+        """Block until a request may be sent."""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+
+class _ApiKeyGate:
+    """
+    Serializes switching the process-wide genai API key.
+    
+    genai.configure is global and models bind a client to whichever key is
+    configured when they first send a request. Requests under the same key
+    run concurrently; a request under another key waits until those finish,
+    then reconfigures.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._key = None
+        self._active = 0
+    
+    def acquire(self, api_key: str):
+        with self._condition:
+            while self._active and self._key != api_key:
+                self._condition.wait()
+            if self._key != api_key:
+                genai.configure(api_key=api_key)
+                self._key = api_key
+            self._active += 1
+    
+    def release(self):
+        with self._condition:
+            self._active -= 1
+            if not self._active:
+                self._condition.notify_all()
+
+
+_API_KEY_GATE = _ApiKeyGate()
+
+
+class _ResponseCache:
+    """
+    Two-tier cache of parsed LLM responses, keyed by a hash of the prompt.
+    
+    An in-process LRU sits in front of an optional on-disk diskcache store,
+    so responses survive restarts and are shared between worker processes.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 256, ttl: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if directory and DISKCACHE_AVAILABLE:
+            try:
+                self._disk = diskcache.Cache(directory)
+            except Exception:
+                self._disk = None
+    
+    @staticmethod
+    def make_key(operation: str, prompt: str) -> str:
+        """Hash an operation and its prompt, ignoring whitespace differences."""
+        normalized = ' '.join(prompt.split())
+        return hashlib.sha256(f"v{_RESPONSE_SCHEMA_VERSION}\0{operation}\0{normalized}".encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached response, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.time():
+                    self._memory.move_to_end(key)
+                    return copy.deepcopy(value)
+                del self._memory[key]
+        
+        if self._disk is not None:
+            try:
+                value = self._disk.get(key)
+            except Exception:
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                return copy.deepcopy(value)
+        return None
+    
+    def put(self, key: str, value: Dict):
+        """Store a successfully parsed response."""
+        if isinstance(value, dict) and value.get('parsed') is False:
+            return
+        self._remember(key, copy.deepcopy(value))
+        if self._disk is not None:
+            try:
+                self._disk.set(key, value, expire=self.ttl)
+            except Exception:
+                pass
+    
+    def _remember(self, key: str, value: Dict):
+        with self._lock:
+            self._memory[key] = (time.time() + self.ttl, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an API error is a rate limit (429) or server error (5xx)."""
+    code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    if isinstance(code, int):
+        return code == 429 or 500 <= code < 600
+    message = str(error)
+    return any(marker in message for marker in ('429', '500', '502', '503', '504', 'Resource has been exhausted'))
+
 
 class LLMAnalyzer:
     """AI-powered contract analysis using Google Gemini."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Operation name -> (prompt builder, response type, fallback label)
+    OPERATIONS = {
+        'analyze_contract': ('_build_analysis_prompt', 'analysis', 'Contract analysis'),
+        'explain_clause': ('_build_explanation_prompt', 'explanation', 'Clause explanation'),
+        'compare_clauses': ('_build_comparison_prompt', 'comparison', 'Clause comparison'),
+        'suggest_alternative_clause': ('_build_alternative_prompt', 'alternative', 'Alternative clause'),
+        'ask_question': ('_build_question_prompt', 'answer', 'Question'),
+    }
+    
+    # Upper bound on a single backoff wait, in seconds
+    MAX_RETRY_DELAY = 60.0
+    
+    # Clauses per bulk explanation request, and their combined character budget
+    BULK_CHUNK_SIZE = 20
+    BULK_CHAR_BUDGET = 8000
+    
+    MODEL_NAME = 'gemini-1.5-flash'
+    
+    # Contracts that don't fit the model's context are analyzed window by
+    # window, with windows overlapping so clauses at the edges aren't cut.
+    # Window size is derived from the model's input token limit, using a
+    # rough characters-per-token estimate and leaving room for the prompt.
+    CHARS_PER_TOKEN = 4
+    PROMPT_TOKEN_RESERVE = 8192
+    # Used when the model's limit can't be looked up
+    DEFAULT_INPUT_TOKEN_LIMIT = 32768
+    ANALYSIS_OVERLAP = 500
+    
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 8,
+                 rpm: int = 15, max_retries: int = 3, cache_dir: Optional[str] = None):
+        """
+        Args:
+            api_key: Gemini API key; defaults to GOOGLE_API_KEY / GEMINI_API_KEY
+            max_concurrency: Requests in flight at once
+            rpm: Requests allowed per minute
+            max_retries: Retries on rate limit and server errors
+            cache_dir: Directory for persisting responses across processes
+                (e.g. DEFAULT_CACHE_DIR). Responses quote the contract, so
+                nothing is written to disk unless this is set.
+        """
         self.api_key = api_key or os.getenv('GOOGLE_API_KEY') or os.getenv('GEMINI_API_KEY')
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.max_retries = max_retries
+        self._limiter = _TokenBucket(rpm)
+        self._cache = _ResponseCache(cache_dir)
+        # Caps requests in flight across threads, including async callers
+        self._in_flight = threading.BoundedSemaphore(max_concurrency)
         self.model = None
         self.is_configured = False
+        self.input_token_limit = self.DEFAULT_INPUT_TOKEN_LIMIT
         
         if self.api_key and GENAI_AVAILABLE:
+            # The key is applied per request through _API_KEY_GATE, since
+            # genai.configure is shared by every analyzer in the process
             try:
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
+                self.model = genai.GenerativeModel(self.MODEL_NAME)
                 self.is_configured = True
             except Exception as e:
                 print(f"Error configuring Gemini: {e}")
+            if self.is_configured:
+                _API_KEY_GATE.acquire(self.api_key)
+                try:
+                    self.input_token_limit = genai.get_model(f'models/{self.MODEL_NAME}').input_token_limit
+                except Exception:
+                    pass
+                finally:
+                    _API_KEY_GATE.release()
     
-    def analyze_contract(self, text: str, contract_type: str = 'general') -> Dict:
-        """Comprehensive AI analysis of contract."""
+    @property
+    def analysis_window(self) -> int:
+        """Characters of contract text sent in one analysis request."""
+        return max(self.ANALYSIS_OVERLAP * 4,
+                   (self.input_token_limit - self.PROMPT_TOKEN_RESERVE) * self.CHARS_PER_TOKEN)
+    
+    def analyze_contract(self, text: str, contract_type: str = 'general', bypass_cache: bool = False,
+                         on_progress: Optional[Callable[[int], None]] = None) -> Dict:
+        """
+        Comprehensive AI analysis of contract.
+        
+        Contracts that don't fit the model's context (analysis_window) are
+        analyzed window by window and the partial analyses merged by a final
+        request, so later clauses are covered rather than truncated away.
+        
+        Args:
+            text: Contract text
+            contract_type: Type of contract
+            bypass_cache: Always call the API, ignoring cached responses
+            on_progress: Called with the number of response characters
+                received so far as responses stream in; for windowed
+                contracts it is called from worker threads
+        """
         if not self.is_configured:
             return self._get_fallback_response("Contract analysis", text)
         
-        prompt = f"""Analyze this {contract_type} contract for an Indian SME. Provide:
+        if len(text) > self.analysis_window:
+            return self._analyze_long_contract(text, contract_type, bypass_cache, on_progress)
+        
+        return self._execute('analyze_contract', (text, contract_type), bypass_cache, on_progress)
+    
+    def _analyze_long_contract(self, text: str, contract_type: str, bypass_cache: bool = False,
+                               on_progress: Optional[Callable[[int], None]] = None) -> Dict:
+        """Map each window through analyze_contract, then reduce to one analysis."""
+        try:
+            key = self._cache.make_key('analyze_long_contract', f"{contract_type}\0{text}")
+            if not bypass_cache:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    return cached
+            
+            windows = self._split_windows(text)
+            received = [0] * (len(windows) + 1)  # Per window, then the merge
+            received_lock = threading.Lock()
+            
+            def progress_for(slot: int) -> Optional[Callable[[int], None]]:
+                if on_progress is None:
+                    return None
+                
+                def report(length: int):
+                    with received_lock:
+                        received[slot] = length
+                        total = sum(received)
+                    on_progress(total)
+                return report
+            
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(windows))) as executor:
+                partials = list(executor.map(
+                    lambda item: self._execute('analyze_contract', (item[1], contract_type), bypass_cache,
+                                               progress_for(item[0])),
+                    enumerate(windows)
+                ))
+            partials = [
+                p for p in partials
+                if isinstance(p, dict) and p.get('status') != 'ai_unavailable' and p.get('parsed') is not False
+            ]
+            if not partials:
+                return self._get_fallback_response("Contract analysis", "")
+            if len(partials) == 1:
+                return partials[0]
+            
+            prompt = self._build_merge_prompt(partials, contract_type)
+            result = self._parse_json_response(self._generate(prompt, progress_for(len(windows))), 'analysis')
+            self._cache.put(key, result)
+            return result
+        except Exception as e:
+            return self._get_fallback_response("Contract analysis", str(e))
+    
+    def _split_windows(self, text: str) -> List[str]:
+        """Split text into overlapping analysis_window windows, preferring line breaks."""
+        window = self.analysis_window
+        windows = []
+        start = 0
+        while True:
+            end = start + window
+            if end >= len(text):
+                windows.append(text[start:])
+                return windows
+            cut = text.rfind('\n', start + window // 2, end)
+            if cut > 0:
+                end = cut + 1
+            windows.append(text[start:end])
+            start = end - self.ANALYSIS_OVERLAP
+    
+    def explain_clause(self, clause_text: str, bypass_cache: bool = False) -> Dict:
+        """Explain a specific clause in plain language."""
+        if not self.is_configured:
+            return self._get_fallback_response("Clause explanation", clause_text)
+        
+        return self._execute('explain_clause', (clause_text,), bypass_cache)
+    
+    def explain_clauses_bulk(self, clauses: List[str]) -> List[Dict]:
+        """
+        Explain many clauses with one request per chunk instead of one per clause.
+        
+        Args:
+            clauses: Clause texts to explain
+            
+        Returns:
+            One explanation dict per clause, in order. A chunk whose response
+            can't be matched back to its clauses is explained clause by clause.
+        """
+        if not self.is_configured:
+            return [self._get_fallback_response("Clause explanation", clause) for clause in clauses]
+        
+        results = [None] * len(clauses)
+        keys = [self._cache.make_key('explain_clause', self._build_explanation_prompt(c)) for c in clauses]
+        pending = []
+        for i, key in enumerate(keys):
+            results[i] = self._cache.get(key)
+            if results[i] is None:
+                pending.append(i)
+        
+        for chunk in self._chunk_clauses([clauses[i] for i in pending]):
+            indices = pending[:len(chunk)]
+            pending = pending[len(chunk):]
+            try:
+                explanations = self._parse_json_response(
+                    self._generate(self._build_bulk_explanation_prompt(chunk)), 'explanation', expect=list
+                )
+            except Exception:
+                explanations = None
+            
+            if isinstance(explanations, list) and len(explanations) == len(chunk) \
+                    and all(isinstance(item, dict) for item in explanations):
+                for i, explanation in zip(indices, explanations):
+                    self._cache.put(keys[i], explanation)
+                    results[i] = explanation
+            else:
+                for i in indices:
+                    results[i] = self.explain_clause(clauses[i])
+        
+        return results
+    
+    def _chunk_clauses(self, clauses: List[str]) -> List[List[str]]:
+        """Split clauses into chunks within BULK_CHUNK_SIZE and BULK_CHAR_BUDGET."""
+        chunks, current, size = [], [], 0
+        for clause in clauses:
+            if current and (len(current) >= self.BULK_CHUNK_SIZE or size + len(clause) > self.BULK_CHAR_BUDGET):
+                chunks.append(current)
+                current, size = [], 0
+            current.append(clause)
+            size += len(clause)
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def compare_clauses(self, original: str, proposed: str, bypass_cache: bool = False) -> Dict:
+        """Compare two versions of a clause."""
+        if not self.is_configured:
+            return self._get_fallback_response("Clause comparison", "")
+        
+        return self._execute('compare_clauses', (original, proposed), bypass_cache)
+    
+    def suggest_alternative_clause(self, clause_text: str, concern: str, bypass_cache: bool = False) -> Dict:
+        """Suggest alternative clause wording."""
+        if not self.is_configured:
+            return self._get_fallback_response("Alternative clause", clause_text)
+        
+        return self._execute('suggest_alternative_clause', (clause_text, concern), bypass_cache)
+    
+    def ask_question(self, question: str, contract_text: str, bypass_cache: bool = False) -> Dict:
+        """Answer questions about the contract."""
+        if not self.is_configured:
+            return self._get_fallback_response("Question", question)
+        
+        return self._execute('ask_question', (question, contract_text), bypass_cache)
+    
+    def _execute(self, operation: str, args: Tuple, bypass_cache: bool = False,
+                 on_progress: Optional[Callable[[int], None]] = None) -> Dict:
+        """Run one operation, serving repeated prompts from the response cache."""
+        builder, response_type, label = self.OPERATIONS[operation]
+        try:
+            prompt = getattr(self, builder)(*args)
+            key = self._cache.make_key(operation, prompt)
+            if not bypass_cache:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    return cached
+            
+            result = self._parse_json_response(self._generate(prompt, on_progress), response_type)
+            self._cache.put(key, result)
+            return result
+        except Exception as e:
+            return self._get_fallback_response(label, str(e))
+    
+    def analyze_batch(self, tasks: List[Tuple]) -> List[Dict]:
+        """
+        Run several operations concurrently on worker threads, overlapping
+        their API round-trips.
+        
+        Args:
+            tasks: (operation, *args) tuples, where operation is a key of
+                OPERATIONS, e.g. ('explain_clause', clause_text)
+            
+        Returns:
+            Results in the same order as tasks; a failed task gets the
+            fallback response instead of failing the batch
+        """
+        if not self.is_configured:
+            return [self._get_fallback_response(self.OPERATIONS[task[0]][2], "") for task in tasks]
+        
+        # Threads rather than asyncio: the client's async transport binds to
+        # the first event loop it runs on, so a fresh loop per call would fail
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(tasks)))) as executor:
+            return list(executor.map(lambda task: self._execute(task[0], tuple(task[1:])), tasks))
+    
+    async def analyze_contract_async(self, text: str, contract_type: str = 'general') -> Dict:
+        """Async analyze_contract; the request runs on a worker thread."""
+        return await asyncio.to_thread(self.analyze_contract, text, contract_type)
+    
+    async def explain_clause_async(self, clause_text: str) -> Dict:
+        """Async explain_clause; the request runs on a worker thread."""
+        return await asyncio.to_thread(self.explain_clause, clause_text)
+    
+    async def explain_clauses_bulk_async(self, clauses: List[str]) -> List[Dict]:
+        """Async explain_clauses_bulk; the requests run on a worker thread."""
+        return await asyncio.to_thread(self.explain_clauses_bulk, clauses)
+    
+    def _generate(self, prompt: str, on_progress: Optional[Callable[[int], None]] = None) -> str:
+        """
+        Generate a response, rate limited and retried on 429/5xx errors.
+        
+        With on_progress, the response is streamed and the callback receives
+        the length received so far after each chunk.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._limiter.acquire()
+            with self._in_flight:
+                _API_KEY_GATE.acquire(self.api_key)
+                try:
+                    if on_progress is None:
+                        return self.model.generate_content(prompt).text
+                    
+                    buffer = io.StringIO()
+                    for chunk in self.model.generate_content(prompt, stream=True):
+                        buffer.write(chunk.text)
+                        on_progress(buffer.tell())
+                    return buffer.getvalue()
+                except Exception as e:
+                    error = e
+                finally:
+                    _API_KEY_GATE.release()
+            
+            # Back off outside the key gate, so other keys aren't held up
+            delay = self._retry_delay(error, attempt)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the call shouldn't be retried."""
+        if attempt >= self.max_retries or not _is_retryable(error):
+            return None
+        
+        # Honour the server's Retry-After hint when present
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        try:
+            return min(self.MAX_RETRY_DELAY, float(headers.get('Retry-After')))
+        except (TypeError, ValueError):
+            pass
+        
+        return min(self.MAX_RETRY_DELAY, 2 ** attempt + random.random())
+    
+    def _build_analysis_prompt(self, text: str, contract_type: str = 'general') -> str:
+        """Build the contract analysis prompt."""
+        return f"""Analyze this {contract_type} contract for an Indian SME. Provide:
 
 1. **Summary**: 2-3 sentence plain language overview
 2. **Key Terms**: List 5-7 most important terms
@@ -44,7 +550,7 @@ class LLMAnalyzer:
 5. **Red Flags**: Any concerning clauses
 
 Contract Text:
-{text[:8000]}
+{text[:self.analysis_window]}
 
 Respond in JSON format:
 {{
@@ -55,19 +561,30 @@ Respond in JSON format:
     "red_flags": ["..."],
     "overall_assessment": "favorable/neutral/unfavorable"
 }}"""
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "analysis")
-        except Exception as e:
-            return self._get_fallback_response("Contract analysis", str(e))
     
-    def explain_clause(self, clause_text: str) -> Dict:
-        """Explain a specific clause in plain language."""
-        if not self.is_configured:
-            return self._get_fallback_response("Clause explanation", clause_text)
-        
-        prompt = f"""Explain this legal clause in simple terms for a small business owner in India:
+    def _build_merge_prompt(self, partials: List[Dict], contract_type: str = 'general') -> str:
+        """Build the prompt merging per-window analyses of one long contract."""
+        sections = "\n\n".join(
+            f"Part {i}:\n{json.dumps(partial, ensure_ascii=False)}" for i, partial in enumerate(partials, 1)
+        )
+        return f"""The following are analyses of consecutive, overlapping parts of one {contract_type} contract for an Indian SME.
+Merge them into a single analysis of the whole contract. Remove duplicates from the overlaps and keep the most severe assessment of each risk.
+
+{sections}
+
+Respond in JSON format:
+{{
+    "summary": "...",
+    "key_terms": ["term1", "term2"],
+    "risks": [{{"issue": "...", "severity": "high/medium/low", "explanation": "..."}}],
+    "recommendations": ["..."],
+    "red_flags": ["..."],
+    "overall_assessment": "favorable/neutral/unfavorable"
+}}"""
+    
+    def _build_explanation_prompt(self, clause_text: str) -> str:
+        """Build the clause explanation prompt."""
+        return f"""Explain this legal clause in simple terms for a small business owner in India:
 
 Clause: "{clause_text}"
 
@@ -84,19 +601,33 @@ Respond in JSON:
     "concerns": ["..."],
     "suggested_changes": "..."
 }}"""
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "explanation")
-        except Exception as e:
-            return self._get_fallback_response("Clause explanation", str(e))
     
-    def compare_clauses(self, original: str, proposed: str) -> Dict:
-        """Compare two versions of a clause."""
-        if not self.is_configured:
-            return self._get_fallback_response("Clause comparison", "")
-        
-        prompt = f"""Compare these two contract clause versions:
+    def _build_bulk_explanation_prompt(self, clauses: List[str]) -> str:
+        """Build the prompt explaining several numbered clauses at once."""
+        numbered = "\n\n".join(f'[{i}] "{clause}"' for i, clause in enumerate(clauses, 1))
+        return f"""Explain each of the following legal clauses in simple terms for a small business owner in India:
+
+{numbered}
+
+For each clause provide:
+1. Plain language explanation (2-3 sentences)
+2. What this means for you practically
+3. Any concerns to watch for
+4. Suggested modifications if unfavorable
+
+Respond with a JSON array containing exactly {len(clauses)} objects, in the same order as the clauses:
+[
+    {{
+        "explanation": "...",
+        "practical_impact": "...",
+        "concerns": ["..."],
+        "suggested_changes": "..."
+    }}
+]"""
+    
+    def _build_comparison_prompt(self, original: str, proposed: str) -> str:
+        """Build the clause comparison prompt."""
+        return f"""Compare these two contract clause versions:
 
 ORIGINAL: "{original}"
 
@@ -116,19 +647,10 @@ Respond in JSON:
     "explanation": "...",
     "recommendation": "..."
 }}"""
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "comparison")
-        except Exception as e:
-            return self._get_fallback_response("Clause comparison", str(e))
     
-    def suggest_alternative_clause(self, clause_text: str, concern: str) -> Dict:
-        """Suggest alternative clause wording."""
-        if not self.is_configured:
-            return self._get_fallback_response("Alternative clause", clause_text)
-        
-        prompt = f"""Suggest an alternative clause that addresses this concern:
+    def _build_alternative_prompt(self, clause_text: str, concern: str) -> str:
+        """Build the alternative clause prompt."""
+        return f"""Suggest an alternative clause that addresses this concern:
 
 Original Clause: "{clause_text}"
 Concern: "{concern}"
@@ -145,19 +667,10 @@ Respond in JSON:
     "explanation": "...",
     "negotiation_tip": "..."
 }}"""
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "alternative")
-        except Exception as e:
-            return self._get_fallback_response("Alternative clause", str(e))
     
-    def ask_question(self, question: str, contract_text: str) -> Dict:
-        """Answer questions about the contract."""
-        if not self.is_configured:
-            return self._get_fallback_response("Question", question)
-        
-        prompt = f"""Based on this contract, answer the question:
+    def _build_question_prompt(self, question: str, contract_text: str) -> str:
+        """Build the contract question prompt."""
+        return f"""Based on this contract, answer the question:
 
 Contract: {contract_text[:6000]}
 
@@ -172,12 +685,6 @@ Respond in JSON:
     "confidence": "high/medium/low",
     "additional_context": "..."
 }}"""
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "answer")
-        except Exception as e:
-            return self._get_fallback_response("Question", str(e))
     
     def generate_summary_report(self, analysis_data: Dict) -> str:
         """Generate a comprehensive summary report."""
@@ -197,23 +704,44 @@ Write a clear, professional report that:
 Format as markdown with headers."""
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self._generate(prompt)
         except:
             return self._generate_basic_report(analysis_data)
     
-    def _parse_json_response(self, text: str, response_type: str) -> Dict:
-        """Parse JSON from LLM response."""
+    def _parse_json_response(self, text: str, response_type: str, expect: type = dict) -> Dict:
+        """
+        Parse JSON from LLM response.
+        
+        Args:
+            text: Raw model output, possibly fenced or wrapped in prose
+            response_type: Label recorded on unparsed responses
+            expect: dict or list, the JSON type the prompt asked for
+        """
+        body = _FENCE_RE.sub('', text.strip())
         try:
-            # Extract JSON from response
-            text = text.strip()
-            if text.startswith('```'):
-                text = text.split('```')[1]
-                if text.startswith('json'):
-                    text = text[4:]
-            return json.loads(text)
-        except:
-            return {"raw_response": text, "type": response_type, "parsed": False}
+            value = _loads(body)
+        except ValueError:
+            pass
+        else:
+            if isinstance(value, expect):
+                return value
+        
+        # Fall back to the outermost braces (brackets for a list), so stray
+        # brackets in surrounding prose such as "see [1]" are skipped;
+        # tolerate trailing commas
+        opener, closer = ('[', ']') if expect is list else ('{', '}')
+        start, end = body.find(opener), body.rfind(closer)
+        if start != -1 and end > start:
+            span = body[start:end + 1]
+            for candidate in (span, _TRAILING_COMMA_RE.sub(r'\1', span)):
+                try:
+                    value, _ = _JSON_DECODER.raw_decode(candidate)
+                except ValueError:
+                    continue
+                if isinstance(value, expect):
+                    return value
+        
+        return {"raw_response": text, "type": response_type, "parsed": False}
     
     def _get_fallback_response(self, operation: str, context: str) -> Dict:
         """Provide fallback when AI is unavailable."""
@@ -3,10 +3,15 @@ NLP Processor Module
 Handles natural language processing for contract analysis using spaCy
 """
 
+import os
 import re
-from typing import Dict, List, Tuple, Optional
+import copy
+import hashlib
+import threading
+from typing import Dict, List, Tuple, Optional, Iterator
 from datetime import datetime
-from collections import defaultdict
+from functools import lru_cache
+from collections import defaultdict, Counter, OrderedDict
 
 try:
     import spacy
@@ -22,6 +27,113 @@ try:
 except ImportError:
     NLTK_AVAILABLE = False
 
+try:
+    import blingfire
+    BLINGFIRE_AVAILABLE = True
+except ImportError:
+    BLINGFIRE_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Suggested location for the opt-in on-disk result cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'legal_assistant', 'nlp')
+
+# Part of every result cache key; bump whenever a change to the extraction
+# logic alters analyze() output, so stale cached results are not served
+_ANALYSIS_SCHEMA_VERSION = 1
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# str.isspace() for every code point up to the last Unicode space (U+3000);
+# the final entry stands in for everything above it
+_WHITESPACE_TABLE = np.array([chr(i).isspace() for i in range(0x3002)]) if NUMPY_AVAILABLE else None
+
+# Only NER is used, so the rest of the pipeline isn't loaded
+SPACY_MODELS = ('en_core_web_sm', 'en_core_web_md', 'en_core_web_lg')
+SPACY_DISABLED_PIPES = ['tagger', 'parser', 'lemmatizer', 'attribute_ruler']
+
+
+@lru_cache(maxsize=None)
+def _load_spacy_model():
+    """Load the first installed spaCy model once per process, or None if none is installed."""
+    if not SPACY_AVAILABLE:
+        return None
+    
+    for model in SPACY_MODELS:
+        try:
+            return spacy.load(model, disable=SPACY_DISABLED_PIPES)
+        except OSError:
+            continue
+    
+    print("No spaCy model found; entity extraction is limited to regex patterns. "
+          "Install one with: python -m spacy download en_core_web_sm")
+    return None
+
+
+class _KeywordScanner:
+    """
+    Finds every keyword occurrence in a single pass over lowercased text.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise
+    a union regex whose lookahead tries every position. The regex reports only
+    the longest keyword at each position, so shorter keywords that prefix it
+    are credited back.
+    """
+    
+    def __init__(self, groups: Dict[str, List[str]]):
+        # Keyword -> groups it belongs to, in declaration order
+        self.groups = {}
+        for group, keywords in groups.items():
+            for kw in keywords:
+                self.groups[kw] = self.groups.get(kw, ()) + (group,)
+        
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.groups:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._regex = re.compile(
+                '(?=(' + '|'.join(re.escape(kw) for kw in sorted(self.groups, key=len, reverse=True)) + '))'
+            )
+            self._prefixes = {
+                kw: tuple(other for other in self.groups if kw.startswith(other))
+                for kw in self.groups
+            }
+    
+    def iter(self, text_lower: str):
+        """Yield each keyword occurrence in text_lower."""
+        if self._automaton is not None:
+            for _, kw in self._automaton.iter(text_lower):
+                yield kw
+        else:
+            for match in self._regex.finditer(text_lower):
+                yield from self._prefixes[match.group(1)]
+    
+    def find_groups(self, text_lower: str) -> set:
+        """Return the set of groups with at least one keyword in text_lower."""
+        return self.groups_of(self.iter(text_lower))
+    
+    def groups_of(self, keywords) -> set:
+        """Return the set of groups the given keywords belong to."""
+        return {group for kw in keywords for group in self.groups[kw]}
+
 
 class NLPProcessor:
     """
@@ -44,6 +156,51 @@ class NLPProcessor:
         r'\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4}',
     ]
     
+    # Context keywords that classify a date, in priority order
+    DATE_CONTEXT_KEYWORDS = {
+        'effective_date': ['effective', 'commencement', 'start'],
+        'expiry_date': ['expiry', 'end', 'termination', 'expire'],
+        'execution_date': ['execution', 'signed', 'signature'],
+        'payment_date': ['payment', 'due', 'payable'],
+    }
+    _DATE_CONTEXT_SCANNER = _KeywordScanner(DATE_CONTEXT_KEYWORDS)
+    
+    # Precompiled scanners; each alternation covers its text in a single pass
+    _ID_RE = re.compile(f'(?P<GSTIN>{GSTIN_PATTERN})|(?P<CIN>{CIN_PATTERN})|(?P<PAN>{PAN_PATTERN})')
+    _DATE_RE = re.compile('|'.join(f'(?:{p})' for p in DATE_PATTERNS), re.IGNORECASE)
+    _MONEY_RE = re.compile(
+        r'(?P<inr>(?:Rs\.?|INR|₹)\s*(?P<inr_amount>[\d,]+(?:\.\d{2})?)\s*(?:(?P<inr_unit>lakhs?|crores?|thousands?))?)'
+        r'|(?P<usd>\$\s*(?P<usd_amount>[\d,]+(?:\.\d{2})?)\s*(?:(?P<usd_unit>million|thousand|billion))?)'
+        r'|(?P<rupees>(?P<rupees_amount>[\d,]+(?:\.\d{2})?)\s*(?:rupees|indian rupees))',
+        re.IGNORECASE
+    )
+    _MONEY_CURRENCIES = {'inr': 'INR', 'usd': 'USD', 'rupees': 'INR'}
+    _MULTIPLIERS = {
+        'thousand': 1000, 'thousands': 1000,
+        'lakh': 100000, 'lakhs': 100000,
+        'crore': 10000000, 'crores': 10000000,
+        'million': 1000000, 'billion': 1000000000
+    }
+    _HEADER_RE = re.compile(
+        r'(?:ARTICLE|SECTION|CLAUSE|PART|SCHEDULE)\s+[IVXLCDM\d]+'
+        r'|\d+\.\s+[A-Z]'
+        r'|[A-Z][A-Z\s]+$'  # All caps
+    )
+    _SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+    _LINE_BREAK_RE = re.compile(r'\n')
+    _HINDI_CHAR_RE = re.compile(r'[\u0900-\u097F]')
+    _ENGLISH_CHAR_RE = re.compile(r'[a-zA-Z]')
+    
+    # Common party introduction patterns
+    PARTY_PATTERNS = [
+        r'(?:between|by and between)\s+([A-Z][A-Za-z\s,]+?)(?:\s*\(|,?\s*(?:hereinafter|a company|an individual|having))',
+        r'(?:Party|PARTY)\s*(?:A|1|ONE|of the First Part)[:\s]+([A-Za-z\s]+)',
+        r'(?:Party|PARTY)\s*(?:B|2|TWO|of the Second Part)[:\s]+([A-Za-z\s]+)',
+        r'"([^"]+)"\s*(?:hereinafter|herein after)',
+        r'([A-Z][A-Za-z\s]+(?:LLP|Pvt\.?\s*Ltd\.?|Private Limited|Limited|Inc\.?|LLC|Corporation|Corp\.?))',
+    ]
+    _PARTY_RES = [re.compile(p) for p in PARTY_PATTERNS]
+    
     # Legal terms
     LEGAL_KEYWORDS = {
         'obligations': ['shall', 'must', 'obligated', 'required to', 'duty to', 'responsible for'],
@@ -57,11 +214,48 @@ class NLPProcessor:
         'dispute': ['dispute', 'arbitration', 'jurisdiction', 'governing law', 'legal proceedings'],
         'payment': ['payment', 'consideration', 'fee', 'remuneration', 'compensation']
     }
+    _LEGAL_SCANNER = _KeywordScanner(LEGAL_KEYWORDS)
+    
+    # Clause importance indicators
+    HIGH_IMPORTANCE = frozenset({
+        'indemnify', 'liability', 'terminate', 'breach', 'penalty',
+        'damages', 'forfeit', 'confidential', 'non-compete',
+        'exclusive', 'irrevocable', 'perpetual', 'unlimited'
+    })
+    MEDIUM_IMPORTANCE = frozenset({
+        'shall', 'must', 'agree', 'obligated', 'required',
+        'payment', 'deliver', 'warranty', 'guarantee'
+    })
+    _IMPORTANCE_SCANNER = _KeywordScanner({'high': HIGH_IMPORTANCE, 'medium': MEDIUM_IMPORTANCE})
+    # Category and importance keywords together, so a clause is scanned once
+    _CLAUSE_SCANNER = _KeywordScanner({**LEGAL_KEYWORDS, 'high': HIGH_IMPORTANCE, 'medium': MEDIUM_IMPORTANCE})
     
-    def __init__(self):
+    MAX_CHUNK_LENGTH = 100000
+    
+    # Number of analysis results kept in memory
+    ANALYSIS_CACHE_SIZE = 64
+    # Seconds an analysis result is kept on disk
+    DISK_CACHE_TTL = 7 * 24 * 3600
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Directory for persisting analysis results across
+                processes (e.g. DEFAULT_CACHE_DIR). Results include contract
+                text, so nothing is written to disk unless this is set.
+        """
         self.nlp = None
         self._load_nlp_model()
         
+        self._results = OrderedDict()
+        self._results_lock = threading.Lock()
+        self._disk_cache = None
+        if cache_dir and DISKCACHE_AVAILABLE:
+            try:
+                self._disk_cache = diskcache.Cache(cache_dir)
+            except Exception:
+                self._disk_cache = None
+        
         if NLTK_AVAILABLE:
             try:
                 nltk.data.find('tokenizers/punkt')
@@ -72,28 +266,8 @@ class NLPProcessor:
                     pass
     
     def _load_nlp_model(self):
-        """Load spaCy model."""
-        if not SPACY_AVAILABLE:
-            return
-        
-        # Try different models
-        models_to_try = ['en_core_web_sm', 'en_core_web_md', 'en_core_web_lg']
-        
-        for model in models_to_try:
-            try:
-                self.nlp = spacy.load(model)
-                return
-            except OSError:
-                continue
-        
-        # If no model found, try to download
-        try:
-            import subprocess
-            subprocess.run(['python', '-m', 'spacy', 'download', 'en_core_web_sm'], 
-                         capture_output=True, timeout=120)
-            self.nlp = spacy.load('en_core_web_sm')
-        except:
-            self.nlp = None
+        """Load spaCy model, shared by every processor in the process."""
+        self.nlp = _load_spacy_model()
     
     def analyze(self, text: str) -> Dict:
         """
@@ -105,71 +279,160 @@ class NLPProcessor:
         Returns:
             Dict containing entities, clauses, and analysis results
         """
+        key = self._cache_key(text)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+        
+        # Stream sentences once, counting them for the statistics on the way
+        clauses, sentence_count = self._scan_clauses(self._iter_sentences(text))
+        
         result = {
             'entities': self._extract_entities(text),
-            'clauses': self._extract_clauses(text),
+            'clauses': clauses,
             'key_terms': self._extract_legal_terms(text),
             'dates': self._extract_dates(text),
             'monetary_values': self._extract_monetary_values(text),
-            'statistics': self._compute_statistics(text),
+            'statistics': self._compute_statistics(text, sentence_count),
             'language_detection': self._detect_language(text)
         }
         
+        self._store_cached(key, result)
         return result
     
+    def _cache_key(self, text: str) -> str:
+        """Hash text together with the analysis version and the loaded model, whose entities end up in the result."""
+        model = f"{self.nlp.meta.get('name')}-{self.nlp.meta.get('version')}" if self.nlp else 'none'
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{_ANALYSIS_SCHEMA_VERSION}\0{model}".encode())
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+    
+    def _get_cached(self, key: str) -> Optional[Dict]:
+        """Return a copy of a previous analysis, checking memory before disk."""
+        with self._results_lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return copy.deepcopy(result)
+        
+        if self._disk_cache is not None:
+            try:
+                result = self._disk_cache.get(key)
+            except Exception:
+                result = None
+            if result is not None:
+                self._remember(key, result)
+                return copy.deepcopy(result)
+        return None
+    
+    def _store_cached(self, key: str, result: Dict):
+        """Keep a copy of result in memory and, when configured, on disk."""
+        self._remember(key, copy.deepcopy(result))
+        if self._disk_cache is not None:
+            try:
+                self._disk_cache.set(key, result, expire=self.DISK_CACHE_TTL)
+            except Exception:
+                pass
+    
+    def _remember(self, key: str, result: Dict):
+        with self._results_lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.ANALYSIS_CACHE_SIZE:
+                self._results.popitem(last=False)
+    
     def _extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Extract named entities from text."""
-        entities = defaultdict(list)
+        # Dicts deduplicate as entities stream in and keep first-seen order
+        entities = defaultdict(dict)
         
         # Use spaCy if available
         if self.nlp:
-            # Process in chunks to handle large documents
-            max_length = 100000
-            chunks = [text[i:i+max_length] for i in range(0, len(text), max_length)]
-            
-            for chunk in chunks:
-                try:
-                    doc = self.nlp(chunk)
+            # Stream chunks through the pipeline to handle large documents
+            try:
+                for doc in self.nlp.pipe(self._chunk_text(text), batch_size=4):
                     for ent in doc.ents:
                         if ent.text.strip() and len(ent.text) > 1:
-                            entities[ent.label_].append(ent.text.strip())
-                except:
-                    pass
+                            entities[ent.label_][ent.text.strip()] = None
+            except:
+                pass
         
         # Extract Indian-specific entities
-        entities['PAN'].extend(re.findall(self.PAN_PATTERN, text))
-        entities['GSTIN'].extend(re.findall(self.GSTIN_PATTERN, text))
-        entities['CIN'].extend(re.findall(self.CIN_PATTERN, text))
-        
-        # Deduplicate
-        for key in entities:
-            entities[key] = list(set(entities[key]))
-        
-        return dict(entities)
+        for match in self._ID_RE.finditer(text):
+            entities[match.lastgroup][match.group()] = None
+            if match.lastgroup == 'GSTIN':
+                # Characters 3-12 of a GSTIN are the holder's PAN
+                entities['PAN'][match.group()[2:12]] = None
+        for key in ('PAN', 'GSTIN', 'CIN'):
+            entities.setdefault(key, {})
+        
+        return {label: list(values) for label, values in entities.items()}
     
-    def _extract_clauses(self, text: str) -> List[Dict]:
-        """Extract and categorize contract clauses."""
-        clauses = []
+    def _chunk_text(self, text: str) -> List[str]:
+        """Split text into chunks of at most MAX_CHUNK_LENGTH, preferring line or sentence breaks."""
+        chunks = []
+        start = 0
+        while len(text) - start > self.MAX_CHUNK_LENGTH:
+            end = start + self.MAX_CHUNK_LENGTH
+            cut = text.rfind('\n', start, end)
+            if cut <= start:
+                cut = text.rfind('. ', start, end)
+            end = cut + 1 if cut > start else end
+            chunks.append(text[start:end])
+            start = end
+        if start < len(text):
+            chunks.append(text[start:])
+        return chunks
+    
+    def _iter_sentences(self, text: str) -> Iterator[str]:
+        """Yield sentences one at a time from the fastest available splitter."""
+        if BLINGFIRE_AVAILABLE:
+            try:
+                lines = blingfire.text_to_sentences(text)
+            except Exception:
+                lines = None
+            if lines is not None:
+                yield from self._iter_split(lines, self._LINE_BREAK_RE)
+                return
         
-        # Split into sentences
         if NLTK_AVAILABLE:
+            # Punkt only returns a complete list
             try:
                 sentences = sent_tokenize(text)
             except:
-                sentences = re.split(r'[.!?]+', text)
-        else:
-            sentences = re.split(r'[.!?]+', text)
+                sentences = None
+            if sentences is not None:
+                yield from sentences
+                return
         
-        # Section patterns
-        section_pattern = re.compile(
-            r'^(?:\d+\.?\s*|\(?[a-z]\)\s*|\(?[ivxlc]+\)\s*)?(.+)$',
-            re.IGNORECASE
-        )
+        yield from self._iter_split(text, self._SENTENCE_SPLIT_RE)
+    
+    @staticmethod
+    def _iter_split(text: str, separator: re.Pattern) -> Iterator[str]:
+        """Lazy equivalent of separator.split(text)."""
+        start = 0
+        for match in separator.finditer(text):
+            yield text[start:match.start()]
+            start = match.end()
+        yield text[start:]
+    
+    def _extract_clauses(self, text: str) -> List[Dict]:
+        """Extract and categorize contract clauses."""
+        return self._scan_clauses(self._iter_sentences(text))[0]
+    
+    def _scan_clauses(self, sentences: Iterator[str]) -> Tuple[List[Dict], int]:
+        """Build clauses from a sentence stream, also returning the non-blank sentence count."""
+        clauses = []
+        sentence_count = 0
         
         current_section = "General"
         
         for i, sentence in enumerate(sentences):
             sentence = sentence.strip()
+            if sentence:
+                sentence_count += 1
             if not sentence or len(sentence) < 10:
                 continue
             
@@ -179,8 +442,9 @@ class NLPProcessor:
                 continue
             
             # Categorize clause
-            clause_type = self._categorize_clause(sentence)
-            importance = self._calculate_importance(sentence)
+            found = set(self._CLAUSE_SCANNER.iter(sentence.lower()))
+            clause_type = self._category_of(self._CLAUSE_SCANNER.groups_of(found))
+            importance = self._importance_of(found)
             
             clauses.append({
                 'id': i + 1,
@@ -191,7 +455,7 @@ class NLPProcessor:
                 'word_count': len(sentence.split())
             })
         
-        return clauses
+        return clauses, sentence_count
     
     def _is_section_header(self, text: str) -> bool:
         """Check if text is a section header."""
@@ -199,42 +463,30 @@ class NLPProcessor:
         
         # Short text with pattern
         if len(text) < 100:
-            patterns = [
-                r'^(?:ARTICLE|SECTION|CLAUSE|PART|SCHEDULE)\s+[IVXLCDM\d]+',
-                r'^\d+\.\s+[A-Z]',
-                r'^[A-Z][A-Z\s]+$',  # All caps
-            ]
-            return any(re.match(p, text) for p in patterns)
+            return self._HEADER_RE.match(text) is not None
         
         return False
     
     def _categorize_clause(self, text: str) -> str:
         """Categorize a clause based on its content."""
-        text_lower = text.lower()
-        
-        for category, keywords in self.LEGAL_KEYWORDS.items():
-            if any(kw in text_lower for kw in keywords):
+        return self._category_of(self._LEGAL_SCANNER.find_groups(text.lower()))
+    
+    def _category_of(self, found_groups: set) -> str:
+        """First category, in LEGAL_KEYWORDS order, among found_groups."""
+        for category in self.LEGAL_KEYWORDS:
+            if category in found_groups:
                 return category
         
         return 'general'
     
     def _calculate_importance(self, text: str) -> str:
         """Calculate importance level of a clause."""
-        text_lower = text.lower()
-        
-        high_importance_indicators = [
-            'indemnify', 'liability', 'terminate', 'breach', 'penalty',
-            'damages', 'forfeit', 'confidential', 'non-compete',
-            'exclusive', 'irrevocable', 'perpetual', 'unlimited'
-        ]
-        
-        medium_importance_indicators = [
-            'shall', 'must', 'agree', 'obligated', 'required',
-            'payment', 'deliver', 'warranty', 'guarantee'
-        ]
-        
-        high_count = sum(1 for kw in high_importance_indicators if kw in text_lower)
-        medium_count = sum(1 for kw in medium_importance_indicators if kw in text_lower)
+        return self._importance_of(set(self._IMPORTANCE_SCANNER.iter(text.lower())))
+    
+    def _importance_of(self, found: set) -> str:
+        """Importance level given the set of keywords found in a clause."""
+        high_count = len(found & self.HIGH_IMPORTANCE)
+        medium_count = len(found & self.MEDIUM_IMPORTANCE)
         
         if high_count >= 2:
             return 'high'
@@ -244,123 +496,101 @@ class NLPProcessor:
     
     def _extract_legal_terms(self, text: str) -> Dict[str, int]:
         """Extract and count legal terms."""
-        text_lower = text.lower()
-        term_counts = {}
-        
-        all_keywords = []
-        for keywords in self.LEGAL_KEYWORDS.values():
-            all_keywords.extend(keywords)
-        
-        for term in set(all_keywords):
-            count = text_lower.count(term)
-            if count > 0:
-                term_counts[term] = count
+        term_counts = Counter(self._LEGAL_SCANNER.iter(text.lower()))
         
         # Sort by count
-        return dict(sorted(term_counts.items(), key=lambda x: x[1], reverse=True))
+        return dict(term_counts.most_common())
     
     def _extract_dates(self, text: str) -> List[Dict]:
         """Extract dates from text."""
         dates = []
-        
-        for pattern in self.DATE_PATTERNS:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                date_str = match.group()
-                context = text[max(0, match.start()-50):min(len(text), match.end()+50)]
-                
-                # Try to determine date context
-                date_type = 'general'
-                context_lower = context.lower()
-                
-                if any(kw in context_lower for kw in ['effective', 'commencement', 'start']):
-                    date_type = 'effective_date'
-                elif any(kw in context_lower for kw in ['expiry', 'end', 'termination', 'expire']):
-                    date_type = 'expiry_date'
-                elif any(kw in context_lower for kw in ['execution', 'signed', 'signature']):
-                    date_type = 'execution_date'
-                elif any(kw in context_lower for kw in ['payment', 'due', 'payable']):
-                    date_type = 'payment_date'
-                
-                dates.append({
-                    'value': date_str,
-                    'type': date_type,
-                    'context': context.strip()
-                })
-        
-        # Deduplicate by value
         seen = set()
-        unique_dates = []
-        for d in dates:
-            if d['value'] not in seen:
-                seen.add(d['value'])
-                unique_dates.append(d)
         
-        return unique_dates
+        for match in self._DATE_RE.finditer(text):
+            # Deduplicate by value as matches stream in
+            date_str = match.group()
+            if date_str in seen:
+                continue
+            seen.add(date_str)
+            
+            context = text[max(0, match.start()-50):min(len(text), match.end()+50)]
+            
+            # Try to determine date context
+            date_type = 'general'
+            found = self._DATE_CONTEXT_SCANNER.find_groups(context.lower())
+            for candidate in self.DATE_CONTEXT_KEYWORDS:
+                if candidate in found:
+                    date_type = candidate
+                    break
+            
+            dates.append({
+                'value': date_str,
+                'type': date_type,
+                'context': context.strip()
+            })
+        
+        return dates
     
     def _extract_monetary_values(self, text: str) -> List[Dict]:
         """Extract monetary values from text."""
         values = []
         
-        # Indian amount patterns
-        patterns = [
-            (r'(?:Rs\.?|INR|₹)\s*([\d,]+(?:\.\d{2})?)\s*(?:(lakhs?|crores?|thousands?))?', 'INR'),
-            (r'\$\s*([\d,]+(?:\.\d{2})?)\s*(?:(million|thousand|billion))?', 'USD'),
-            (r'([\d,]+(?:\.\d{2})?)\s*(?:rupees|indian rupees)', 'INR'),
-        ]
-        
-        for pattern, currency in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                amount_str = match.group(1).replace(',', '')
-                try:
-                    amount = float(amount_str)
-                except ValueError:
-                    continue
-                
-                # Apply multiplier
-                multiplier_map = {
-                    'thousand': 1000, 'thousands': 1000,
-                    'lakh': 100000, 'lakhs': 100000,
-                    'crore': 10000000, 'crores': 10000000,
-                    'million': 1000000, 'billion': 1000000000
-                }
-                
-                if match.lastindex and match.lastindex >= 2 and match.group(2):
-                    multiplier = multiplier_map.get(match.group(2).lower(), 1)
-                    amount *= multiplier
-                
-                context = text[max(0, match.start()-50):min(len(text), match.end()+50)]
-                
-                values.append({
-                    'original': match.group(),
-                    'amount': amount,
-                    'currency': currency,
-                    'context': context.strip()
-                })
+        for match in self._MONEY_RE.finditer(text):
+            kind = match.lastgroup
+            amount_str = match.group(f'{kind}_amount').replace(',', '')
+            try:
+                amount = float(amount_str)
+            except ValueError:
+                continue
+            
+            # Apply multiplier
+            unit = match.group(f'{kind}_unit') if kind != 'rupees' else None
+            if unit:
+                amount *= self._MULTIPLIERS.get(unit.lower(), 1)
+            
+            context = text[max(0, match.start()-50):min(len(text), match.end()+50)]
+            
+            values.append({
+                'original': match.group(),
+                'amount': amount,
+                'currency': self._MONEY_CURRENCIES[kind],
+                'context': context.strip()
+            })
         
         return values
     
-    def _compute_statistics(self, text: str) -> Dict:
+    def _compute_statistics(self, text: str, sentence_count: Optional[int] = None) -> Dict:
         """Compute text statistics."""
-        words = text.split()
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        word_count, word_chars = self._count_words(text)
+        if sentence_count is None:
+            sentence_count = sum(1 for s in self._iter_sentences(text) if s.strip())
         
         return {
             'character_count': len(text),
-            'word_count': len(words),
-            'sentence_count': len(sentences),
-            'avg_word_length': sum(len(w) for w in words) / max(len(words), 1),
-            'avg_sentence_length': len(words) / max(len(sentences), 1),
+            'word_count': word_count,
+            'sentence_count': sentence_count,
+            'avg_word_length': word_chars / max(word_count, 1),
+            'avg_sentence_length': word_count / max(sentence_count, 1),
             'paragraph_count': text.count('\n\n') + 1
         }
     
+    def _count_words(self, text: str) -> Tuple[int, int]:
+        """Count whitespace-separated words and their total length, as text.split() would."""
+        if NUMPY_AVAILABLE and text:
+            # Classify code points in C instead of allocating a string per word
+            codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+            space = _WHITESPACE_TABLE[np.minimum(codes, 0x3001)]
+            word_starts = ~space
+            word_starts[1:] &= space[:-1]
+            return int(np.count_nonzero(word_starts)), len(codes) - int(np.count_nonzero(space))
+        
+        words = text.split()
+        return len(words), sum(map(len, words))
+    
     def _detect_language(self, text: str) -> Dict:
         """Detect language of the text."""
         # Simple heuristic-based detection
-        hindi_chars = len(re.findall(r'[\u0900-\u097F]', text))
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
+        hindi_chars, english_chars = self._count_script_chars(text)
         total_chars = max(hindi_chars + english_chars, 1)
         
         hindi_ratio = hindi_chars / total_chars
@@ -378,27 +608,37 @@ class NLPProcessor:
             'is_multilingual': hindi_ratio > 0.1 and english_ratio > 0.1
         }
     
+    def _count_script_chars(self, text: str) -> Tuple[int, int]:
+        """Count Devanagari and ASCII letter characters in text."""
+        if NUMPY_AVAILABLE:
+            # Compare code points in C rather than running two regex scans
+            codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+            hindi = int(np.count_nonzero((codes >= 0x0900) & (codes <= 0x097F)))
+            folded = codes | 0x20  # ASCII upper case onto lower case
+            english = int(np.count_nonzero((folded >= 0x61) & (folded <= 0x7A) & (codes < 0x80)))
+            return hindi, english
+        
+        return len(self._HINDI_CHAR_RE.findall(text)), len(self._ENGLISH_CHAR_RE.findall(text))
+    
     def identify_parties(self, text: str) -> List[Dict]:
         """Identify parties mentioned in the contract."""
         parties = []
+        seen = set()
+        head = text[:5000]  # Focus on beginning
         
-        # Common party introduction patterns
-        patterns = [
-            r'(?:between|by and between)\s+([A-Z][A-Za-z\s,]+?)(?:\s*\(|,?\s*(?:hereinafter|a company|an individual|having))',
-            r'(?:Party|PARTY)\s*(?:A|1|ONE|of the First Part)[:\s]+([A-Za-z\s]+)',
-            r'(?:Party|PARTY)\s*(?:B|2|TWO|of the Second Part)[:\s]+([A-Za-z\s]+)',
-            r'"([^"]+)"\s*(?:hereinafter|herein after)',
-            r'([A-Z][A-Za-z\s]+(?:LLP|Pvt\.?\s*Ltd\.?|Private Limited|Limited|Inc\.?|LLC|Corporation|Corp\.?))',
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text[:5000])  # Focus on beginning
-            for match in matches:
+        for pattern in self._PARTY_RES:
+            for match in pattern.finditer(head):
                 party_name = match.group(1).strip()
                 if party_name and len(party_name) > 2 and len(party_name) < 100:
+                    # Deduplicate
+                    name_normalized = party_name.lower()
+                    if name_normalized in seen:
+                        continue
+                    seen.add(name_normalized)
+                    
                     # Determine party type
                     party_type = 'organization'
-                    if any(kw in party_name.lower() for kw in ['mr.', 'mrs.', 'ms.', 'dr.', 'individual']):
+                    if any(kw in name_normalized for kw in ['mr.', 'mrs.', 'ms.', 'dr.', 'individual']):
                         party_type = 'individual'
                     
                     parties.append({
@@ -407,16 +647,7 @@ class NLPProcessor:
                         'context': text[max(0, match.start()-20):min(len(text), match.end()+100)]
                     })
         
-        # Deduplicate
-        seen = set()
-        unique_parties = []
-        for p in parties:
-            name_normalized = p['name'].lower().strip()
-            if name_normalized not in seen:
-                seen.add(name_normalized)
-                unique_parties.append(p)
-        
-        return unique_parties
+        return parties
 
 
 # For testing
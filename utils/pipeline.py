@@ -0,0 +1,60 @@
+"""
+Pipeline Module
+Runs local NLP analysis and Gemini analysis of a contract concurrently
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from .nlp_processor import NLPProcessor
+from .llm_analyzer import LLMAnalyzer
+
+
+async def full_pipeline(text: str, contract_type: str = 'general',
+                        nlp: Optional[NLPProcessor] = None,
+                        llm: Optional[LLMAnalyzer] = None) -> Dict:
+    """
+    Analyze a contract, overlapping local and remote work.
+    
+    The NLP analysis runs in a worker thread while the contract analysis
+    request is in flight. High-importance clauses are then explained with
+    bulk requests, a few clauses per request, to stay within the rate limit.
+    
+    Args:
+        text: Contract text
+        contract_type: Type of contract
+        nlp: Processor to use; a new one is created if omitted
+        llm: Analyzer to use; a new one is created if omitted
+        
+    Returns:
+        Dict with 'nlp', 'ai' and 'clause_explanations' results
+    """
+    nlp = nlp or NLPProcessor()
+    llm = llm or LLMAnalyzer()
+    
+    nlp_result, ai_result = await asyncio.gather(
+        asyncio.to_thread(nlp.analyze, text),
+        llm.analyze_contract_async(text, contract_type)
+    )
+    
+    clause_explanations = []
+    if llm.is_configured:
+        clauses = [c for c in nlp_result['clauses'] if c['importance'] == 'high']
+        explanations = await llm.explain_clauses_bulk_async([c['text'] for c in clauses])
+        clause_explanations = [
+            {'clause_id': clause['id'], 'text': clause['text'], 'explanation': explanation}
+            for clause, explanation in zip(clauses, explanations)
+        ]
+    
+    return {
+        'nlp': nlp_result,
+        'ai': ai_result,
+        'clause_explanations': clause_explanations
+    }
+
+
+def run_full_pipeline(text: str, contract_type: str = 'general',
+                      nlp: Optional[NLPProcessor] = None,
+                      llm: Optional[LLMAnalyzer] = None) -> Dict:
+    """Synchronous entry point for full_pipeline; LLM requests run on threads, so a fresh loop is safe."""
+    return asyncio.run(full_pipeline(text, contract_type, nlp, llm))
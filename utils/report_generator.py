@@ -4,43 +4,180 @@ Generates PDF and text reports for contract analysis
 """
 
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import BinaryIO, Dict
 import io
+import os
 
 try:
+    # Attribute validation on graphics shapes is a development aid; keep it
+    # only in debug runs. Must be set before reportlab.graphics is imported.
+    from reportlab import rl_config
+    if not os.getenv('LEGAL_ASSISTANT_DEBUG'):
+        rl_config.shapeChecking = 0
+    
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import A4
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, LongTable
     REPORTLAB_AVAILABLE = True
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+try:
+    import jinja2
+    JINJA2_AVAILABLE = True
+except ImportError:
+    JINJA2_AVAILABLE = False
+
+try:
+    from markupsafe import escape
+except ImportError:
+    import html
+    
+    def escape(value) -> str:
+        return html.escape(str(value))
+
+
+_HTML_TEMPLATE_SRC = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Contract Analysis Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+        .header { text-align: center; border-bottom: 2px solid #333; padding-bottom: 20px; }
+        .score-box { background: {{ risk_color }}; color: white; padding: 20px; border-radius: 10px; text-align: center; margin: 20px 0; }
+        .section { margin: 20px 0; }
+        .finding { background: #f8f9fa; padding: 15px; margin: 10px 0; border-left: 4px solid; border-radius: 4px; }
+        .finding.high { border-color: #dc3545; }
+        .finding.medium { border-color: #fd7e14; }
+        .finding.low { border-color: #28a745; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { padding: 10px; border: 1px solid #ddd; text-align: left; }
+        th { background: #333; color: white; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Contract Analysis Report</h1>
+        <p>Generated: {{ generated_at }}</p>
+    </div>
+    
+    <div class="score-box">
+        <h2>Risk Score: {{ score }}/100</h2>
+        <p>{{ risk_level.upper() }} RISK</p>
+    </div>
+    
+    <div class="section">
+        <h2>Executive Summary</h2>
+        <p>{{ summary.get('assessment', 'No summary available.') }}</p>
+        <p><strong>Recommended Action:</strong> {{ summary.get('recommended_action', 'Review the contract carefully.') }}</p>
+    </div>
+    
+    <div class="section">
+        <h2>Risk Statistics</h2>
+        <table>
+            <tr><th>Category</th><th>Count</th></tr>
+            <tr><td>Total Risks</td><td>{{ stats.get('total_risks', 0) }}</td></tr>
+            <tr><td>Critical</td><td>{{ stats.get('critical_risks', 0) }}</td></tr>
+            <tr><td>High</td><td>{{ stats.get('high_risks', 0) }}</td></tr>
+            <tr><td>Medium</td><td>{{ stats.get('medium_risks', 0) }}</td></tr>
+            <tr><td>Low</td><td>{{ stats.get('low_risks', 0) }}</td></tr>
+        </table>
+    </div>
+    
+    <div class="section">
+        <h2>Risk Findings</h2>
+        {%- for finding in findings %}{% set level = finding.get('level', 'low') %}
+        <div class="finding {{ level }}">
+            <h3>{{ finding.get('category', 'Unknown') }} [{{ level.upper() }}]</h3>
+            <p>{{ finding.get('description', '') }}</p>
+            <p><em>Recommendation: {{ finding.get('recommendation', '') }}</em></p>
+        </div>
+        {%- endfor %}
+    </div>
+</body>
+</html>"""
+
+# Text report rules
+_RULE = "=" * 60
+_SUBRULE = "-" * 40
+
+# Opt-in directory for compiled template bytecode, like the other disk caches;
+# nothing is written under the user's home unless it is set
+TEMPLATE_CACHE_DIR = os.getenv('LEGAL_ASSISTANT_JINJA_CACHE_DIR')
+
+
+def _template_bytecode_cache():
+    """On-disk bytecode cache so new worker processes skip template compilation."""
+    if not TEMPLATE_CACHE_DIR:
+        return None
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        return jinja2.FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    except OSError:
+        return None
+
+
+# Compiled once at import; rendering runs Jinja's generated Python code
+if JINJA2_AVAILABLE:
+    _HTML_ENV = jinja2.Environment(
+        autoescape=True,
+        loader=jinja2.DictLoader({'report.html': _HTML_TEMPLATE_SRC}),
+        bytecode_cache=_template_bytecode_cache()
+    )
+    _HTML_TEMPLATE = _HTML_ENV.get_template('report.html')
+else:
+    _HTML_TEMPLATE = None
+
+
+def report_timestamp() -> str:
+    """Timestamp shown in report headers; share one across formats of a report."""
+    return datetime.now().strftime('%Y-%m-%d %H:%M')
+
+
+@lru_cache(maxsize=1)
+def _build_styles():
+    """Build the report stylesheet once per process; getSampleStyleSheet is costly."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='RiskHigh', parent=styles['Normal'], textColor=colors.red))
+    styles.add(ParagraphStyle(name='RiskMedium', parent=styles['Normal'], textColor=colors.orange))
+    styles.add(ParagraphStyle(name='RiskLow', parent=styles['Normal'], textColor=colors.green))
+    return styles
+
 
 class ReportGenerator:
     """Generates professional PDF and text reports."""
     
     def __init__(self):
-        self.styles = None
-        if REPORTLAB_AVAILABLE:
-            self.styles = getSampleStyleSheet()
-            self.styles.add(ParagraphStyle(name='RiskHigh', parent=self.styles['Normal'], textColor=colors.red))
-            self.styles.add(ParagraphStyle(name='RiskMedium', parent=self.styles['Normal'], textColor=colors.orange))
-            self.styles.add(ParagraphStyle(name='RiskLow', parent=self.styles['Normal'], textColor=colors.green))
+        self.styles = _build_styles() if REPORTLAB_AVAILABLE else None
     
-    def generate_pdf(self, analysis_data: Dict, filename: str = None) -> bytes:
+    def generate_pdf(self, analysis_data: Dict, filename: str = None, generated_at: str = None) -> bytes:
         """Generate PDF report."""
+        buffer = io.BytesIO()
+        self.generate_pdf_to(analysis_data, buffer, generated_at)
+        return buffer.getvalue()
+    
+    def generate_pdf_to(self, analysis_data: Dict, fp: BinaryIO, generated_at: str = None) -> None:
+        """
+        Write the PDF report straight to a binary stream.
+        
+        Args:
+            analysis_data: Risk analysis result
+            fp: Writable binary file object, e.g. an open file or response stream
+            generated_at: Header timestamp; defaults to now (see report_timestamp)
+        """
         if not REPORTLAB_AVAILABLE:
             raise ImportError("reportlab not installed. Run: pip install reportlab")
         
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+        doc = SimpleDocTemplate(fp, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
         story = []
         
         # Title
         story.append(Paragraph("Contract Analysis Report", self.styles['Title']))
-        story.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", self.styles['Normal']))
+        story.append(Paragraph(f"Generated: {generated_at or report_timestamp()}", self.styles['Normal']))
         story.append(Spacer(1, 20))
         
         # Risk Score
@@ -83,76 +220,80 @@ class ReportGenerator:
         findings = analysis_data.get('findings', [])
         if findings:
             story.append(Paragraph("Risk Findings", self.styles['Heading2']))
-            for i, finding in enumerate(findings[:10], 1):
+            # One LongTable row per finding: the layout engine splits it by row
+            # across pages instead of re-flowing a long run of paragraphs, so
+            # every finding can be rendered
+            rows = [['#', 'Finding', 'Level']]
+            for i, finding in enumerate(findings, 1):
                 level = finding.get('level', 'low')
                 style = self.styles.get(f'Risk{level.title()}', self.styles['Normal'])
-                story.append(Paragraph(f"<b>{i}. {finding.get('category', 'Unknown')}</b> [{level.upper()}]", style))
-                story.append(Paragraph(finding.get('description', ''), self.styles['Normal']))
-                story.append(Paragraph(f"<i>Recommendation: {finding.get('recommendation', '')}</i>", self.styles['Normal']))
-                story.append(Spacer(1, 10))
+                rows.append([
+                    str(i),
+                    [
+                        Paragraph(f"<b>{finding.get('category', 'Unknown')}</b>", style),
+                        Paragraph(finding.get('description', ''), self.styles['Normal']),
+                        Paragraph(f"<i>Recommendation: {finding.get('recommendation', '')}</i>", self.styles['Normal'])
+                    ],
+                    Paragraph(level.upper(), style)
+                ])
+            table = LongTable(rows, colWidths=[0.4*inch, doc.width - 1.4*inch, 1*inch], repeatRows=1)
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('BOTTOMPADDING', (0, 1), (-1, -1), 8)
+            ]))
+            story.append(table)
         
         # Build PDF
         doc.build(story)
-        buffer.seek(0)
-        return buffer.getvalue()
     
-    def generate_text_report(self, analysis_data: Dict) -> str:
+    def generate_text_report(self, analysis_data: Dict, generated_at: str = None) -> str:
         """Generate plain text report."""
-        lines = []
-        lines.append("=" * 60)
-        lines.append("CONTRACT ANALYSIS REPORT")
-        lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        lines.append("=" * 60)
-        lines.append("")
+        # Written straight into one buffer; long finding lists don't build up
+        # a list of line fragments first
+        buf = io.StringIO()
+        w = buf.write
+        w(f"{_RULE}\nCONTRACT ANALYSIS REPORT\nGenerated: {generated_at or report_timestamp()}\n{_RULE}\n\n")
         
         # Risk Score
         score = analysis_data.get('overall_score', 0)
         risk_level = analysis_data.get('risk_level', 'unknown')
-        lines.append(f"OVERALL RISK SCORE: {score}/100 ({risk_level.upper()})")
-        lines.append("")
+        w(f"OVERALL RISK SCORE: {score}/100 ({risk_level.upper()})\n\n")
         
         # Summary
         summary = analysis_data.get('summary', {})
         if summary:
-            lines.append("-" * 40)
-            lines.append("EXECUTIVE SUMMARY")
-            lines.append("-" * 40)
-            lines.append(summary.get('assessment', ''))
-            lines.append(f"\nRecommended Action: {summary.get('recommended_action', '')}")
-            lines.append("")
+            w(f"{_SUBRULE}\nEXECUTIVE SUMMARY\n{_SUBRULE}\n")
+            w(f"{summary.get('assessment', '')}\n")
+            w(f"\nRecommended Action: {summary.get('recommended_action', '')}\n\n")
         
         # Statistics
         stats = analysis_data.get('statistics', {})
         if stats:
-            lines.append("-" * 40)
-            lines.append("RISK STATISTICS")
-            lines.append("-" * 40)
-            lines.append(f"Total Risks: {stats.get('total_risks', 0)}")
-            lines.append(f"  - Critical: {stats.get('critical_risks', 0)}")
-            lines.append(f"  - High: {stats.get('high_risks', 0)}")
-            lines.append(f"  - Medium: {stats.get('medium_risks', 0)}")
-            lines.append(f"  - Low: {stats.get('low_risks', 0)}")
-            lines.append("")
+            w(f"{_SUBRULE}\nRISK STATISTICS\n{_SUBRULE}\n")
+            w(f"Total Risks: {stats.get('total_risks', 0)}\n")
+            w(f"  - Critical: {stats.get('critical_risks', 0)}\n")
+            w(f"  - High: {stats.get('high_risks', 0)}\n")
+            w(f"  - Medium: {stats.get('medium_risks', 0)}\n")
+            w(f"  - Low: {stats.get('low_risks', 0)}\n\n")
         
         # Findings
         findings = analysis_data.get('findings', [])
         if findings:
-            lines.append("-" * 40)
-            lines.append("RISK FINDINGS")
-            lines.append("-" * 40)
+            w(f"{_SUBRULE}\nRISK FINDINGS\n{_SUBRULE}\n")
             for i, finding in enumerate(findings, 1):
-                lines.append(f"\n{i}. {finding.get('category', 'Unknown')} [{finding.get('level', 'low').upper()}]")
-                lines.append(f"   {finding.get('description', '')}")
-                lines.append(f"   Recommendation: {finding.get('recommendation', '')}")
+                w(f"\n{i}. {finding.get('category', 'Unknown')} [{finding.get('level', 'low').upper()}]\n"
+                  f"   {finding.get('description', '')}\n"
+                  f"   Recommendation: {finding.get('recommendation', '')}\n")
         
-        lines.append("")
-        lines.append("=" * 60)
-        lines.append("END OF REPORT")
-        lines.append("=" * 60)
+        w(f"\n{_RULE}\nEND OF REPORT\n{_RULE}")
         
-        return "\n".join(lines)
+        return buf.getvalue()
     
-    def generate_html_report(self, analysis_data: Dict) -> str:
+    def generate_html_report(self, analysis_data: Dict, generated_at: str = None) -> str:
         """Generate HTML report."""
         score = analysis_data.get('overall_score', 0)
         risk_level = analysis_data.get('risk_level', 'unknown')
@@ -161,8 +302,16 @@ class ReportGenerator:
         findings = analysis_data.get('findings', [])
         
         risk_color = {'high': '#dc3545', 'medium': '#fd7e14', 'low': '#28a745'}.get(risk_level, '#6c757d')
+        generated_at = generated_at or report_timestamp()
+        
+        if _HTML_TEMPLATE is not None:
+            return _HTML_TEMPLATE.render(
+                score=score, risk_level=risk_level, risk_color=risk_color, summary=summary,
+                stats=stats, findings=findings, generated_at=generated_at
+            )
         
-        html = f"""<!DOCTYPE html>
+        # Without Jinja2, collect escaped fragments and join once
+        parts = [f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -184,18 +333,18 @@ class ReportGenerator:
 <body>
     <div class="header">
         <h1>Contract Analysis Report</h1>
-        <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+        <p>Generated: {generated_at}</p>
     </div>
     
     <div class="score-box">
         <h2>Risk Score: {score}/100</h2>
-        <p>{risk_level.upper()} RISK</p>
+        <p>{escape(risk_level.upper())} RISK</p>
     </div>
     
     <div class="section">
         <h2>Executive Summary</h2>
-        <p>{summary.get('assessment', 'No summary available.')}</p>
-        <p><strong>Recommended Action:</strong> {summary.get('recommended_action', 'Review the contract carefully.')}</p>
+        <p>{escape(summary.get('assessment', 'No summary available.'))}</p>
+        <p><strong>Recommended Action:</strong> {escape(summary.get('recommended_action', 'Review the contract carefully.'))}</p>
     </div>
     
     <div class="section">
@@ -211,19 +360,19 @@ class ReportGenerator:
     </div>
     
     <div class="section">
-        <h2>Risk Findings</h2>"""
+        <h2>Risk Findings</h2>"""]
         
-        for finding in findings[:10]:
+        for finding in findings:
             level = finding.get('level', 'low')
-            html += f"""
-        <div class="finding {level}">
-            <h3>{finding.get('category', 'Unknown')} [{level.upper()}]</h3>
-            <p>{finding.get('description', '')}</p>
-            <p><em>Recommendation: {finding.get('recommendation', '')}</em></p>
-        </div>"""
-        
-        html += """
+            parts.append(f"""
+        <div class="finding {escape(level)}">
+            <h3>{escape(finding.get('category', 'Unknown'))} [{escape(level.upper())}]</h3>
+            <p>{escape(finding.get('description', ''))}</p>
+            <p><em>Recommendation: {escape(finding.get('recommendation', ''))}</em></p>
+        </div>""")
+        
+        parts.append("""
     </div>
 </body>
-</html>"""
-        return html
+</html>""")
+        return "".join(parts)
@@ -4,10 +4,33 @@ Identifies and scores risks in legal contracts
 """
 
 import re
-from typing import Dict, List
+import sys
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# First to last non-whitespace character, so a window can be trimmed with one slice
+_TRIM_RE = re.compile(r'\S(?:.*\S)?', re.DOTALL)
+
+
+def _lower_aligned(text: str) -> str:
+    """Lowercase text without shifting character offsets"""
+    text_lower = text.lower()
+    if text.isascii() or len(text_lower) == len(text):
+        return text_lower
+    # A few characters (e.g. 'İ') grow when lowercased; keep those as-is so
+    # match offsets still index into the original text
+    return ''.join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
 
 class RiskLevel(Enum):
     LOW = "low"
@@ -16,8 +39,19 @@ class RiskLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+_LEVEL_SCORE: Dict[RiskLevel, float] = {RiskLevel.LOW: 0.2, RiskLevel.MEDIUM: 0.4, RiskLevel.HIGH: 0.7, RiskLevel.CRITICAL: 1.0}
+_LEVEL_WEIGHT: Dict[RiskLevel, int] = {RiskLevel.CRITICAL: 4, RiskLevel.HIGH: 3, RiskLevel.MEDIUM: 2, RiskLevel.LOW: 1}
+# Severity order; level strings don't sort by severity ('low' > 'critical')
+_LEVEL_RANK: Dict[RiskLevel, int] = {RiskLevel.LOW: 0, RiskLevel.MEDIUM: 1, RiskLevel.HIGH: 2, RiskLevel.CRITICAL: 3}
+# Enum .value goes through a descriptor on every access
+_LEVEL_VALUE: Dict[RiskLevel, str] = {level: level.value for level in RiskLevel}
+
+
+@dataclass(frozen=True)
 class RiskItem:
+    # Declared by hand rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = ('category', 'level', 'description', 'clause_text', 'recommendation', 'score')
+    
     category: str
     level: RiskLevel
     description: str
@@ -26,6 +60,29 @@ class RiskItem:
     score: float
 
 
+def _build_anchor_automaton(risk_patterns: Dict):
+    """
+    Index every risk pattern by the literal word it starts with.
+    
+    The automaton finds all anchor words in one pass; each pattern then only
+    needs an anchored match where its anchor occurs. Returns None when a
+    pattern has no literal prefix to anchor on.
+    """
+    anchors = {}
+    for risk_id, config in risk_patterns.items():
+        for i, pattern in enumerate(config['patterns']):
+            prefix = re.match(r'[a-z]+', pattern)
+            if prefix is None:
+                return None
+            anchors.setdefault(prefix.group(), []).append((f'{risk_id}__{i}', risk_id, i, re.compile(pattern)))
+    
+    automaton = ahocorasick.Automaton()
+    for anchor, candidates in anchors.items():
+        automaton.add_word(anchor, (len(anchor), tuple(candidates)))
+    automaton.make_automaton()
+    return automaton
+
+
 class RiskAnalyzer:
     """Analyzes contracts for legal and business risks."""
     
@@ -92,65 +149,142 @@ class RiskAnalyzer:
         }
     }
     
+    # Every pattern in one scan. Each alternative is named <risk_id>__<index>
+    # and sits inside a lookahead, so matches don't consume text. Only the
+    # first alternative that matches at a position is reported, though: a
+    # pattern whose matches all start where an earlier pattern also matches
+    # is never seen. This agrees with per-pattern re.search only while no two
+    # patterns can match at the same position, as holds for the table above
+    # (patterns sharing a first word diverge right after it). The anchor
+    # automaton below, used when available, has no such limitation.
+    _RISK_RE = re.compile('(?=' + '|'.join(
+        f'(?P<{risk_id}__{i}>{pattern})'
+        for risk_id, config in RISK_PATTERNS.items()
+        for i, pattern in enumerate(config['patterns'])
+    ) + ')')
+    _RISK_AUTOMATON = _build_anchor_automaton(RISK_PATTERNS) if AHOCORASICK_AVAILABLE else None
+    
+    # Display title, description and recommendation per risk, built once and
+    # shared by every finding and result dict
+    _RISK_TEXT = {
+        risk_id: (
+            sys.intern(risk_id.replace('_', ' ').title()),
+            sys.intern(config['description']),
+            sys.intern(config['recommendation'])
+        )
+        for risk_id, config in RISK_PATTERNS.items()
+    }
+    
+    CLAUSE_CACHE_SIZE = 1024
+    
     def __init__(self):
         self.findings = []
         self.overall_score = 0
+        # Clauses recur across a contract (and across re-runs of the same one);
+        # remember which risks each clause text triggered
+        self._clause_risk_ids = lru_cache(maxsize=self.CLAUSE_CACHE_SIZE)(self._scan_clause)
     
     def analyze(self, text: str, contract_type: str = 'general') -> Dict:
         self.findings = []
-        text_lower = text.lower()
+        text_lower = _lower_aligned(text)
         
-        for risk_id, config in self.RISK_PATTERNS.items():
-            for pattern in config['patterns']:
-                if re.search(pattern, text_lower):
-                    match = re.search(pattern, text_lower)
-                    start = max(0, match.start() - 100)
-                    end = min(len(text), match.end() + 100)
-                    
-                    self.findings.append(RiskItem(
-                        category=risk_id,
-                        level=config['level'],
-                        description=config['description'],
-                        clause_text=text[start:end].strip(),
-                        recommendation=config['recommendation'],
-                        score=self._level_to_score(config['level'])
-                    ))
-                    break
+        for risk_id, (match_start, match_end) in self._find_risks(text_lower).items():
+            config = self.RISK_PATTERNS[risk_id]
+            _, description, recommendation = self._RISK_TEXT[risk_id]
+            window = _TRIM_RE.search(text, max(0, match_start - 100), match_end + 100)
+            
+            self.findings.append(RiskItem(
+                category=risk_id,
+                level=config['level'],
+                description=description,
+                clause_text=text[window.start():window.end()],
+                recommendation=recommendation,
+                score=self._level_to_score(config['level'])
+            ))
         
-        self.overall_score = self._calculate_overall_score()
+        counts = Counter(f.level for f in self.findings)
+        self.overall_score = self._calculate_overall_score(counts)
         
         return {
             'findings': [self._to_dict(f) for f in self.findings],
             'overall_score': self.overall_score,
             'risk_level': self._score_to_level(self.overall_score),
-            'summary': self._generate_summary(contract_type),
+            'summary': self._generate_summary(contract_type, counts),
             'statistics': {
                 'total_risks': len(self.findings),
-                'critical_risks': sum(1 for f in self.findings if f.level == RiskLevel.CRITICAL),
-                'high_risks': sum(1 for f in self.findings if f.level == RiskLevel.HIGH),
-                'medium_risks': sum(1 for f in self.findings if f.level == RiskLevel.MEDIUM),
-                'low_risks': sum(1 for f in self.findings if f.level == RiskLevel.LOW)
+                'critical_risks': counts[RiskLevel.CRITICAL],
+                'high_risks': counts[RiskLevel.HIGH],
+                'medium_risks': counts[RiskLevel.MEDIUM],
+                'low_risks': counts[RiskLevel.LOW]
             }
         }
     
+    def _find_risks(self, text_lower: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Locate each risk's first match in a single pass over the text.
+        
+        Returns:
+            Span of the first occurrence of the first matching pattern for
+            each risk found, in RISK_PATTERNS order
+        """
+        first_hits = {}
+        # Risks whose first pattern has matched; their later patterns can't win
+        settled = set()
+        if self._RISK_AUTOMATON is not None:
+            # Anchor words arrive in text order, so the first anchored match
+            # of a pattern is its leftmost one
+            for end, (length, candidates) in self._RISK_AUTOMATON.iter(text_lower):
+                start = end - length + 1
+                for name, risk_id, index, regex in candidates:
+                    if risk_id in settled or name in first_hits:
+                        continue
+                    match = regex.match(text_lower, start)
+                    if match:
+                        first_hits[name] = match.span()
+                        if index == 0:
+                            settled.add(risk_id)
+                if len(settled) == len(self.RISK_PATTERNS):
+                    break
+        else:
+            for match in self._RISK_RE.finditer(text_lower):
+                name = match.lastgroup
+                if name not in first_hits:
+                    first_hits[name] = match.span(name)
+                    risk_id, _, index = name.rpartition('__')
+                    if index == '0':
+                        settled.add(risk_id)
+                        if len(settled) == len(self.RISK_PATTERNS):
+                            break
+        
+        risks = {}
+        for risk_id, config in self.RISK_PATTERNS.items():
+            for i in range(len(config['patterns'])):
+                span = first_hits.get(f'{risk_id}__{i}')
+                if span is not None:
+                    risks[risk_id] = span
+                    break
+        return risks
+    
     def _level_to_score(self, level: RiskLevel) -> float:
-        return {RiskLevel.LOW: 0.2, RiskLevel.MEDIUM: 0.4, RiskLevel.HIGH: 0.7, RiskLevel.CRITICAL: 1.0}.get(level, 0.5)
+        return _LEVEL_SCORE.get(level, 0.5)
     
     def _score_to_level(self, score: float) -> str:
         if score >= 70: return 'high'
         elif score >= 40: return 'medium'
         return 'low'
     
-    def _calculate_overall_score(self) -> float:
-        if not self.findings: return 15
-        weights = {RiskLevel.CRITICAL: 4, RiskLevel.HIGH: 3, RiskLevel.MEDIUM: 2, RiskLevel.LOW: 1}
-        total_weight = sum(weights[f.level] for f in self.findings)
-        weighted_score = sum(f.score * weights[f.level] for f in self.findings)
-        return min(100, round((weighted_score / max(total_weight, 1)) * 100 * min(1.5, 1 + len(self.findings) * 0.05)))
+    def _calculate_overall_score(self, counts: Counter) -> float:
+        # Every finding of a level has the same score, so the weighted mean
+        # reduces over the per-level counts rather than the findings
+        total = sum(counts.values())
+        if not total: return 15
+        total_weight = sum(_LEVEL_WEIGHT[level] * n for level, n in counts.items())
+        weighted_score = sum(_LEVEL_SCORE[level] * _LEVEL_WEIGHT[level] * n for level, n in counts.items())
+        return min(100, round((weighted_score / total_weight) * 100 * min(1.5, 1 + total * 0.05)))
     
-    def _generate_summary(self, contract_type: str) -> Dict:
-        critical = sum(1 for f in self.findings if f.level == RiskLevel.CRITICAL)
-        high = sum(1 for f in self.findings if f.level == RiskLevel.HIGH)
+    def _generate_summary(self, contract_type: str, counts: Counter) -> Dict:
+        critical = counts[RiskLevel.CRITICAL]
+        high = counts[RiskLevel.HIGH]
         
         if critical > 0:
             assessment = "Critical risk clauses require immediate attention."
@@ -166,25 +300,29 @@ class RiskAnalyzer:
     
     def _to_dict(self, item: RiskItem) -> Dict:
         return {
-            'category': item.category.replace('_', ' ').title(),
-            'level': item.level.value,
+            'category': self._RISK_TEXT[item.category][0],
+            'level': _LEVEL_VALUE[item.level],
             'description': item.description,
             'clause_text': item.clause_text[:500],
             'recommendation': item.recommendation,
             'score': round(item.score * 100)
         }
     
+    def _scan_clause(self, clause_text: str) -> Tuple[str, ...]:
+        return tuple(self._find_risks(clause_text.lower()))
+    
     def get_clause_risk(self, clause_text: str) -> Dict:
-        text_lower = clause_text.lower()
         risks = []
+        top_level = None
         
-        for risk_id, config in self.RISK_PATTERNS.items():
-            for pattern in config['patterns']:
-                if re.search(pattern, text_lower):
-                    risks.append({'type': risk_id.replace('_', ' ').title(), 'level': config['level'].value, 'recommendation': config['recommendation']})
-                    break
+        for risk_id in self._clause_risk_ids(clause_text):
+            title, _, recommendation = self._RISK_TEXT[risk_id]
+            level = self.RISK_PATTERNS[risk_id]['level']
+            if top_level is None or _LEVEL_RANK[level] > _LEVEL_RANK[top_level]:
+                top_level = level
+            risks.append({'type': title, 'level': _LEVEL_VALUE[level], 'recommendation': recommendation})
         
         if not risks:
             return {'has_risks': False, 'risk_level': 'low', 'risks': []}
         
-        return {'has_risks': True, 'risk_level': max(r['level'] for r in risks), 'risks': risks}
+        return {'has_risks': True, 'risk_level': _LEVEL_VALUE[top_level], 'risks': risks}